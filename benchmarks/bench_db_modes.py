@@ -0,0 +1,86 @@
+"""
+Пропускная способность репозитория в разных режимах подключения к Postgres.
+
+Запуск: python -m benchmarks.bench_db_modes [--pgbouncer-host H --pgbouncer-port P]
+
+Параметры базы берутся из Settings (.env). Если адрес PgBouncer не указан,
+режим pgbouncer запускается против той же базы - так видна цена отключённого
+кэша подготовленных выражений.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.core.config import Settings
+from src.infrastructure.ioc_container.session_provider import build_engine
+from src.infrastructure.postgres.repositories.user_repo import UserRepository
+
+
+def modes(settings: Settings, args: argparse.Namespace) -> dict[str, Settings]:
+    base = settings.model_copy(update={"pg_echo": False})
+    pgbouncer = {"pg_pool_mode": "pgbouncer"}
+    if args.pgbouncer_host:
+        pgbouncer.update(pg_host=args.pgbouncer_host, pg_port=args.pgbouncer_port)
+    return {
+        "direct": base,
+        "direct, tuned cache": base.model_copy(
+            update={
+                "pg_statement_cache_size": 1024,
+                "pg_prepared_statement_cache_size": 1024,
+                "pg_pool_pre_ping": False,
+            }
+        ),
+        "pgbouncer": base.model_copy(update=pgbouncer),
+        "pgbouncer, prepared": base.model_copy(
+            update={**pgbouncer, "pg_pgbouncer_prepared_statements": True}
+        ),
+    }
+
+
+async def worker(session_pool: async_sessionmaker, iterations: int) -> list[float]:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        async with session_pool() as session:
+            repo = UserRepository(session)
+            await repo.filter(username=f"bench-{uuid4().hex[:8]}")
+            await repo.get_many([uuid4() for _ in range(10)])
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_mode(settings: Settings, concurrency: int, iterations: int):
+    engine = build_engine(settings)
+    session_pool = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        await worker(session_pool, 5)
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(worker(session_pool, iterations) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        await engine.dispose()
+    latencies = sorted(latency for result in results for latency in result)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return len(latencies) / elapsed, statistics.median(latencies), p99
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'mode':<24}{'req/s':>10}{'p50, ms':>10}{'p99, ms':>10}")
+    for name, settings in modes(Settings(), args).items():
+        rps, p50, p99 = await run_mode(settings, args.concurrency, args.iterations)
+        print(f"{name:<24}{rps:>10.0f}{p50 * 1e3:>10.2f}{p99 * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--pgbouncer-host")
+    parser.add_argument("--pgbouncer-port", type=int, default=6432)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,86 @@
+"""
+Стоимость DI и подготовки сессии на запрос, который не доходит до БД.
+
+Запуск: python -m benchmarks.bench_di_overhead [iterations]
+
+Сравнивает прежний UnitOfWork (сессия и репозитории создаются при разрешении
+зависимости) с ленивым. Подключение к Postgres не требуется.
+"""
+import asyncio
+import sys
+import time
+from collections.abc import AsyncIterable
+
+from dishka import Provider, Scope, make_async_container, provide
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Settings
+from src.infrastructure.ioc_container import SessionProvider, UowProvider
+from src.infrastructure.postgres.repositories.refresh_token_repo import \
+    RefreshTokenRepository
+from src.infrastructure.postgres.repositories.user_repo import UserRepository
+from src.infrastructure.postgres.uow import UnitOfWork
+
+
+class EagerUnitOfWork:
+    """Прежнее поведение: всё создаётся сразу."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.user = UserRepository(session)
+        self.refresh_token = RefreshTokenRepository(session)
+
+
+class EagerUowProvider(Provider):
+    @provide(scope=Scope.REQUEST)
+    async def get_uow(self, session: AsyncSession) -> EagerUnitOfWork:
+        return EagerUnitOfWork(session)
+
+
+class NoopProvider(Provider):
+    @provide(scope=Scope.REQUEST)
+    async def get_marker(self) -> AsyncIterable[int]:
+        yield 0
+
+
+async def measure(container, dependency, iterations: int) -> float:
+    async def request():
+        async with container() as request_container:
+            await request_container.get(dependency)
+
+    for _ in range(100):
+        await request()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await request()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int) -> None:
+    context = {Settings: Settings()}
+    cases = {
+        "request container only": (
+            make_async_container(SessionProvider(), NoopProvider(), context=context),
+            int,
+        ),
+        "eager UnitOfWork": (
+            make_async_container(
+                SessionProvider(), EagerUowProvider(), context=context
+            ),
+            EagerUnitOfWork,
+        ),
+        "lazy UnitOfWork": (
+            make_async_container(SessionProvider(), UowProvider(), context=context),
+            UnitOfWork,
+        ),
+    }
+    print(f"{'case':<26}{'us/request':>12}")
+    for name, (container, dependency) in cases.items():
+        try:
+            print(f"{name:<26}{await measure(container, dependency, iterations):>12.2f}")
+        finally:
+            await container.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
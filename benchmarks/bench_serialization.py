@@ -0,0 +1,149 @@
+"""
+Сравнение стандартного и быстрого пути сериализации DTO авторизации.
+
+Запуск: python -m benchmarks.bench_serialization [iterations]
+"""
+import itertools
+import json
+import sys
+import time
+from typing import Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import BaseModel, EmailStr
+
+from src.app.dto.authorization import CreateUserDTO, LoginUserDTO, TokenDTO
+
+CREATE_BODY = orjson.dumps(
+    {
+        "username": "bench_user",
+        "email": "bench.user@example.com",
+        "password": "secret-password",
+        "first_name": "Bench",
+        "last_name": "User",
+    }
+)
+LOGIN_BODY = orjson.dumps({"email": "bench.user@example.com", "password": "secret"})
+TOKEN = "x" * 700
+
+
+class LegacyCreateUserDTO(BaseModel):
+    username: str
+    email: EmailStr
+    password: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+
+
+class LegacyLoginUserDTO(LoginUserDTO):
+    email: Optional[EmailStr] = None
+
+
+def measure(func, iterations: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def unique_create_bodies():
+    # Каждый раз новый email: замер без попаданий в кэш проверки адресов.
+    for number in itertools.count():
+        yield orjson.dumps(
+            {
+                "username": f"bench_user_{number}",
+                "email": f"bench.user.{number}@example.com",
+                "password": "secret-password",
+            }
+        )
+
+
+def bench_requests(iterations: int) -> list[tuple[str, float, float]]:
+    legacy_bodies, fast_bodies = unique_create_bodies(), unique_create_bodies()
+    return [
+        (
+            "CreateUserDTO*",
+            measure(
+                lambda: LegacyCreateUserDTO.model_validate(
+                    json.loads(next(legacy_bodies))
+                ),
+                iterations,
+            ),
+            measure(
+                lambda: CreateUserDTO.model_validate(orjson.loads(next(fast_bodies))),
+                iterations,
+            ),
+        ),
+        (
+            "CreateUserDTO",
+            measure(
+                lambda: LegacyCreateUserDTO.model_validate(json.loads(CREATE_BODY)),
+                iterations,
+            ),
+            measure(
+                lambda: CreateUserDTO.model_validate(orjson.loads(CREATE_BODY)),
+                iterations,
+            ),
+        ),
+        (
+            "LoginUserDTO",
+            measure(
+                lambda: LegacyLoginUserDTO.model_validate(json.loads(LOGIN_BODY)),
+                iterations,
+            ),
+            measure(
+                lambda: LoginUserDTO.model_validate(orjson.loads(LOGIN_BODY)),
+                iterations,
+            ),
+        ),
+    ]
+
+
+def run_sync(coro):
+    # serialize_response ничего не ждёт: выполняем корутину без event loop,
+    # чтобы не добавлять к замеру накладные расходы цикла.
+    try:
+        coro.send(None)
+    except StopIteration as result:
+        return result.value
+    raise RuntimeError("coroutine was suspended")
+
+
+def bench_response(iterations: int) -> tuple[str, float, float]:
+    field = create_model_field(name="Response", type_=TokenDTO, mode="serialization")
+
+    def legacy():
+        content = run_sync(
+            serialize_response(
+                field=field,
+                response_content=TokenDTO(
+                    access_token=TOKEN, token_type="Bearer", info="ok"
+                ),
+                is_coroutine=True,
+            )
+        )
+        return ORJSONResponse(content)
+
+    def fast():
+        return ORJSONResponse(
+            {"access_token": TOKEN, "token_type": "Bearer", "info": "ok"}
+        )
+
+    return "TokenDTO", measure(legacy, iterations), measure(fast, iterations)
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = bench_requests(iterations) + [bench_response(iterations)]
+    print(f"{'path':<16}{'legacy, us':>12}{'fast, us':>12}{'saved, us':>12}")
+    for name, legacy, fast in rows:
+        print(f"{name:<16}{legacy:>12.2f}{fast:>12.2f}{legacy - fast:>12.2f}")
+    print("* unique email per request, email validation cache misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Размер access-токена и время подписи/проверки по профилям claims и алгоритмам.
+
+Запуск: python -m benchmarks.bench_token_profiles [iterations]
+
+Ключи генерируются на лету; ключи из настроек не используются.
+"""
+import sys
+import time
+import uuid
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from src.domain.entities.user import User
+from src.services.jwt_utils import build_access_claims, decode_jwt, encode_jwt
+
+
+def pem_pair(private_key) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+ALGORITHMS = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+USER = User(
+    id=uuid.uuid4(),
+    username="bench_user",
+    email="bench.user@example.com",
+    token_version=3,
+)
+
+
+def measure(func, iterations: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(
+        f"{'algorithm':<10}{'profile':<10}{'bytes':>8}"
+        f"{'encode, us':>12}{'decode, us':>12}"
+    )
+    for algorithm, generate in ALGORITHMS.items():
+        private_key, public_key = pem_pair(generate())
+        for profile in ("full", "compact"):
+            claims = build_access_claims(USER, profile)
+
+            def encode():
+                return encode_jwt(claims, private_key, algorithm)
+
+            token = encode()
+
+            def decode():
+                return decode_jwt(token, public_key, algorithm)
+
+            print(
+                f"{algorithm:<10}{profile:<10}{len(token):>8}"
+                f"{measure(encode, iterations):>12.1f}"
+                f"{measure(decode, iterations):>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
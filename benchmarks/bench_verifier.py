@@ -0,0 +1,67 @@
+"""
+Время проверки токена через сервер src.app.verifier: по одному запросу
+с ожиданием ответа и пачками (pipelining).
+
+Запуск (сервер уже запущен с теми же настройками ключей):
+    python -m benchmarks.bench_verifier [iterations] [batch]
+"""
+import socket
+import sys
+import time
+import uuid
+
+from src.app.verifier import FRAME_HEADER, VerifyStatus
+from src.core.config import Settings
+from src.domain.entities.user import User
+from src.services.jwt_utils import build_access_claims, encode_jwt
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Verifier closed the connection.")
+        data += chunk
+    return bytes(data)
+
+
+def recv_response(sock: socket.socket) -> tuple[int, bytes]:
+    (length,) = FRAME_HEADER.unpack(recv_exactly(sock, FRAME_HEADER.size))
+    body = recv_exactly(sock, length)
+    return body[0], body[1:]
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    settings = Settings()
+    user = User(id=uuid.uuid4(), username="bench_user", email="bench@example.com")
+    token = encode_jwt(build_access_claims(user)).encode()
+    frame = FRAME_HEADER.pack(len(token)) + token
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(settings.verifier_socket_path)
+        sock.sendall(frame)
+        status, claims = recv_response(sock)
+        print(f"status {VerifyStatus(status).name}, claims {claims.decode()}")
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            sock.sendall(frame)
+            recv_response(sock)
+        sequential = (time.perf_counter() - start) / iterations * 1e6
+
+        start = time.perf_counter()
+        for _ in range(iterations // batch):
+            sock.sendall(frame * batch)
+            for _ in range(batch):
+                recv_response(sock)
+        pipelined = (time.perf_counter() - start) / (iterations // batch * batch) * 1e6
+
+    print(f"sequential: {sequential:.1f} us/token")
+    print(f"pipelined (batch {batch}): {pipelined:.1f} us/token")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import orjson
+from fastapi import Request
+from fastapi.routing import APIRoute
+
+
+class ORJSONRequest(Request):
+    """Разбирает JSON-тело запроса через orjson вместо стандартного json."""
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError наследует json.JSONDecodeError,
+            # поэтому FastAPI формирует ту же ошибку 422 "json_invalid".
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request):
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
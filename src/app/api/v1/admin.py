@@ -0,0 +1,249 @@
+import secrets
+from dataclasses import asdict
+from datetime import UTC, date, datetime
+from typing import Annotated
+from uuid import UUID
+
+import orjson
+from dishka import FromDishka
+from dishka.integrations.fastapi import inject
+from fastapi import (APIRouter, Depends, Header, HTTPException, Query,
+                     Security, status)
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from fastapi.security import APIKeyHeader
+
+from src.app.api.routing import ORJSONRoute
+from src.app.dto.admin import (BatchLookupDTO, BatchLookupResultDTO,
+                               IntrospectTokenDTO, LoginAnalyticsDTO,
+                               RevokeSessionsDTO, RevokeSessionsResultDTO,
+                               SetTokenEpochDTO, TokenEpochDTO,
+                               TokenIntrospectionDTO)
+from src.app.middleware.query_stats import query_budget
+from src.core.config import settings
+from src.core.notifier import change_notifier
+from src.domain.entities.user import User
+from src.infrastructure.postgres.uow import UnitOfWork
+from src.services.change_events import (add_sessions_revoked_events,
+                                        stream_change_events)
+from src.services.jwt_utils import (claims_issued_at, claims_token_version,
+                                    decode_jwt, is_token_revoked)
+from src.services.token_epoch import token_epoch
+
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+
+
+def verify_admin_key(api_key: str | None = Security(admin_key_header)) -> None:
+    if not settings.admin_api_key or not api_key or not secrets.compare_digest(
+        api_key, settings.admin_api_key
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API key missing or invalid.",
+        )
+
+
+router = APIRouter(
+    route_class=ORJSONRoute if settings.fast_serialization else APIRoute,
+    dependencies=[Depends(verify_admin_key)],
+)
+
+
+def user_to_dict(user: User) -> dict:
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "created_at": user.created_at,
+        "token_version": user.token_version,
+    }
+
+
+@router.get("/users/export")
+@inject
+async def export_users(uow: FromDishka[UnitOfWork]):
+    """Выгрузка всех пользователей в NDJSON (без хешей паролей)."""
+
+    async def rows():
+        chunk = []
+        async for user in uow.user.stream(settings.export_fetch_size):
+            chunk.append(orjson.dumps(user_to_dict(user)))
+            if len(chunk) >= settings.export_fetch_size:
+                yield b"\n".join(chunk) + b"\n"
+                chunk.clear()
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/users/lookup",
+    response_model=BatchLookupResultDTO,
+    # Один запрос на пачку из batch_lookup_chunk_size id.
+    dependencies=[
+        query_budget(
+            -(-settings.batch_lookup_max_ids // settings.batch_lookup_chunk_size)
+        )
+    ],
+)
+@inject
+async def lookup_users(data: BatchLookupDTO, uow: FromDishka[UnitOfWork]):
+    """Пакетный поиск пользователей по id: один запрос на пачку id."""
+    found = await uow.user.get_many(data.ids, settings.batch_lookup_chunk_size)
+    results = [
+        {"id": str(user_id), "found": True, "user": user_to_dict(found[user_id])}
+        if user_id in found
+        else {"id": str(user_id), "found": False, "user": None}
+        for user_id in data.ids
+    ]
+    if not settings.fast_serialization:
+        return BatchLookupResultDTO(results=results)
+    return ORJSONResponse({"results": results})
+
+
+@router.post(
+    "/sessions/revoke",
+    response_model=RevokeSessionsResultDTO,
+    dependencies=[query_budget(3)],
+)
+@inject
+async def revoke_sessions(data: RevokeSessionsDTO, uow: FromDishka[UnitOfWork]):
+    """
+    Принудительный выход выбранных пользователей: token_version
+    и отзыв refresh-токенов, по одному UPDATE на каждое,
+    и одна вставка событий в outbox - пачками id, а не по событию
+    на пользователя.
+    """
+    user_ids = await uow.user.bump_token_versions(data.ids, data.created_before)
+    refresh_tokens = (
+        await uow.refresh_token.revoke_for_users(user_ids) if user_ids else 0
+    )
+    add_sessions_revoked_events(
+        uow, user_ids, data.created_before, by_ids=data.ids is not None
+    )
+    await uow.commit()
+    return {"users": len(user_ids), "refresh_tokens": refresh_tokens}
+
+
+@router.get("/sessions/not-before", response_model=TokenEpochDTO)
+@inject
+async def get_token_epoch(uow: FromDishka[UnitOfWork]):
+    return {"not_before": await uow.token_epoch.get()}
+
+
+@router.post(
+    "/sessions/not-before",
+    response_model=TokenEpochDTO,
+    dependencies=[query_budget(1)],
+)
+@inject
+async def set_token_epoch(data: SetTokenEpochDTO, uow: FromDishka[UnitOfWork]):
+    """
+    Отзывает все токены, выпущенные до not_before, не затрагивая строки
+    пользователей. Остальные воркеры подхватывают границу в течение
+    TOKEN_EPOCH_REFRESH_SEC.
+    """
+    not_before = await uow.token_epoch.set(data.not_before or datetime.now(UTC))
+    await uow.commit()
+    token_epoch.not_before = not_before
+    return {"not_before": not_before}
+
+
+@router.get(
+    "/analytics/logins",
+    response_model=LoginAnalyticsDTO,
+    dependencies=[query_budget(2)],
+)
+@inject
+async def login_analytics(
+    uow: FromDishka[UnitOfWork],
+    date_from: date,
+    date_to: date,
+    user_id: UUID | None = None,
+    top_user_agents: int = Query(default=10, ge=1, le=100),
+):
+    """
+    Входы по дням и самые частые user agent за [date_from, date_to] (UTC).
+    Читается сводка login_daily_stats: данные отстают на интервал её
+    обновления (LOGIN_ROLLUP_INTERVAL_SEC + LOGIN_ROLLUP_LAG_SEC).
+    """
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to.",
+        )
+    days = await uow.login_analytics.daily_logins(date_from, date_to, user_id)
+    user_agents = await uow.login_analytics.top_user_agents(
+        date_from, date_to, top_user_agents, user_id
+    )
+    return {
+        "days": [asdict(day) for day in days],
+        "user_agents": [asdict(agent) for agent in user_agents],
+    }
+
+
+@router.post(
+    "/tokens/introspect",
+    response_model=TokenIntrospectionDTO,
+    response_model_exclude_none=True,
+    dependencies=[query_budget(1)],
+)
+@inject
+async def introspect_token(data: IntrospectTokenDTO, uow: FromDishka[UnitOfWork]):
+    """
+    Проверка access-токена для внутренних сервисов (по мотивам RFC 7662).
+    Токен активен, если подпись и срок верны, он не старше границы отзыва
+    и его версия совпадает с token_version пользователя. Для активного
+    токена возвращаются данные пользователя, которых нет в компактном профиле.
+    """
+    try:
+        claims = decode_jwt(data.token)
+        user_id = UUID(claims["sub"])
+    except Exception:
+        return {"active": False}
+    if is_token_revoked(claims):
+        return {"active": False}
+    users = await uow.user.filter(id=user_id)
+    if not users or users[0].token_version != claims_token_version(claims):
+        return {"active": False}
+
+    user = users[0]
+    return {
+        "active": True,
+        "sub": user_id,
+        "ver": user.token_version,
+        "iat": claims_issued_at(claims),
+        "exp": claims["exp"],
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+    }
+
+
+@router.get("/events")
+@inject
+async def change_events(
+    uow: FromDishka[UnitOfWork],
+    last_event_id: Annotated[int | None, Header(alias="Last-Event-ID", ge=0)] = None,
+    after: Annotated[int | None, Query(ge=0)] = None,
+):
+    """
+    Поток изменений пользователей (server-sent events) для инвалидации
+    кэшей. Курсор - Last-Event-ID при переподключении или параметр after.
+    """
+    cursor = last_event_id if last_event_id is not None else after
+    return StreamingResponse(
+        stream_change_events(
+            uow,
+            change_notifier,
+            cursor,
+            settings.outbox_batch_size,
+            settings.outbox_keepalive_sec,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,89 @@
-from typing import Optional
+from typing import Annotated
+from uuid import UUID
 
 from dishka import FromDishka
 from dishka.integrations.fastapi import inject
-from fastapi import APIRouter, Body, HTTPException, status, Request
+from fastapi import (APIRouter, Depends, Header, HTTPException, Request,
+                     status)
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
 
-from src.app.dto.authorization import CreateUserDTO, TokenDTO, LoginUserDTO, UpdateTokenDTO, UpdatePasswordDTO, \
+from src.app.api.routing import ORJSONRoute
+from src.app.dto.authorization import CreateUserDTO, TokenDTO, LoginUserDTO, RefreshTokenDTO, UpdatePasswordDTO, \
     UpdateUserDTO
+from src.app.middleware.bearer_auth import bearer_claims
+from src.app.middleware.query_stats import query_budget
+from src.core.config import settings
+from src.domain.entities.idempotency import IdempotencyRecord
 from src.domain.entities.user import User
 from src.infrastructure.postgres.uow import UnitOfWork
-from src.services.jwt_utils import encode_jwt, decode_jwt, validate_pwd, hash_pwd
+from src.services.change_events import (USER_DELETED, USER_PASSWORD_CHANGED,
+                                        USER_UPDATED)
+from src.services.idempotency import IdempotentRequest
+from src.services.jwt_utils import (build_access_claims, encode_jwt, hash_pwd,
+                                    validate_pwd)
+from src.services.refresh_tokens import issue_refresh_token, rotate_refresh_token
+
+router = APIRouter(route_class=ORJSONRoute if settings.fast_serialization else APIRoute)
+
+
+def token_payload(access_token: str, info: str, refresh_token: str | None = None):
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "Bearer",
+        "info": info,
+    }
+
+
+def render_token(payload: dict):
+    if not settings.fast_serialization:
+        return TokenDTO(**payload)
+    # Содержимое уже соответствует TokenDTO, а готовый Response
+    # FastAPI отдаёт без повторной валидации через response_model.
+    return ORJSONResponse(payload)
+
+
+def token_response(access_token: str, info: str, refresh_token: str | None = None):
+    return render_token(token_payload(access_token, info, refresh_token))
+
+
+def issue_access_token(user: User) -> str:
+    return encode_jwt(build_access_claims(user))
+
+
+def token_outcome(user: User, info: str) -> dict:
+    return {
+        "user_id": str(user.id),
+        "token_version": user.token_version,
+        "info": info,
+    }
+
+
+async def replay_token_response(uow, record: IdempotencyRecord) -> ORJSONResponse:
+    """
+    Ответ на повтор запроса с Idempotency-Key: изменения и bcrypt не
+    повторяются, записей в БД нет. Пользователю из сохранённого итога
+    выпускается новый access-токен; refresh-токен не сохраняется и не
+    выпускается заново - его даёт только первый ответ или /login.
+    Если пользователь с тех пор удалён или его token_version изменилась,
+    итог устарел - 409.
+    """
+    outcome = record.outcome
+    users = await uow.user.filter(id=UUID(outcome["user_id"]))
+    if not users or users[0].token_version != outcome["token_version"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency-Key result is outdated: the user has changed since.",
+        )
+    # Завершает транзакцию и снимает блокировку ключа.
+    await uow.rollback()
+    return ORJSONResponse(
+        token_payload(issue_access_token(users[0]), outcome["info"]),
+        status_code=record.status_code,
+        headers={"Idempotent-Replayed": "true"},
+    )
 
-router = APIRouter()
 
 async def get_user_by_login(uow, user_data):
     users = None
@@ -28,12 +101,21 @@ async def get_user_by_login(uow, user_data):
     return user
 
 
-@router.post("/registration", response_model=TokenDTO)
+IdempotencyKey = Annotated[str | None, Header(alias="Idempotency-Key", max_length=255)]
+
+
+# Бюджеты включают 3 выражения на Idempotency-Key: блокировка, чтение, запись.
+@router.post("/registration", response_model=TokenDTO, dependencies=[query_budget(8)])
 @inject
 async def register_user(
     data: CreateUserDTO,
     uow: FromDishka[UnitOfWork],
+    idempotency_key: IdempotencyKey = None,
 ):
+    idempotent = IdempotentRequest(uow, "registration", idempotency_key, data)
+    if (record := await idempotent.replay()) is not None:
+        return await replay_token_response(uow, record)
+
     email = await uow.user.filter(email=data.email)
     username = await uow.user.filter(username=data.username)
     if email or username:
@@ -50,106 +132,67 @@ async def register_user(
         last_name=data.last_name,
     )
     created_user = await uow.user.create(user)
-    await uow.commit()
-
-    payload = {
-        "sub": str(created_user.id),
-        "username": created_user.username,
-        "email": created_user.email,
-        "token_version": created_user.token_version
-    }
-    access_token = encode_jwt(payload)
+    refresh_token = await issue_refresh_token(uow, created_user.id)
+    info = "User registration was successful."
+    await idempotent.commit(token_outcome(created_user, info))
 
-    return TokenDTO(
-        token_type="Bearer",
-        access_token=access_token,
-        info="User registration was successful.",
-    )
+    return token_response(issue_access_token(created_user), info, refresh_token)
 
-@router.post("/login", response_model=TokenDTO)
+@router.post("/login", response_model=TokenDTO, dependencies=[query_budget(3)])
 @inject
 async def login_user(
+    request: Request,
     user_data: LoginUserDTO,
     uow: FromDishka[UnitOfWork],
 ):
     user = await get_user_by_login(uow, user_data)
+    if settings.login_history_enabled:
+        await uow.user.add_login_history(
+            user.id,
+            request.headers.get("user-agent"),
+            {"ip": request.client.host if request.client else None},
+        )
+    refresh_token = await issue_refresh_token(uow, user.id)
+    await uow.commit()
 
-    payload = {
-        "sub": str(user.id), "email": user.email,
-        "username": user.username , "token_version":user.token_version
-    }
-    access_token = encode_jwt(payload)
-
-    return TokenDTO(
-        token_type="Bearer",
-        access_token=access_token,
-        info="User logged in successfully.",
+    return token_response(
+        issue_access_token(user), "User logged in successfully.", refresh_token
     )
 
-@router.post("/refresh", response_model=TokenDTO)
+@router.post("/refresh", response_model=TokenDTO, dependencies=[query_budget(3)])
 @inject
 async def refresh_token_endpoint(
-    request: Request,
+    data: RefreshTokenDTO,
     uow: FromDishka[UnitOfWork],
-    data: Optional[UpdateTokenDTO] = Body(default=None),
 ):
-    auth_header = request.headers.get("Authorization")
-    token = None
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header[7:]
-    if not token and data:
-        token = data.token
-
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Access token missing."
-        )
-
-    try:
-        payload = decode_jwt(token)
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token payload.")
-
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid access token."
-        )
-
-    user = await uow.user.get(id=user_id)
-    token_version = payload.get("token_version")
-    if not user:
+    current, refresh_token = await rotate_refresh_token(uow, data.refresh_token)
+    users = await uow.user.filter(id=current.user_id)
+    if not users:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found."
         )
-    if user.token_version != token_version:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token please update your access token."
-        )
+    await uow.commit()
 
-    new_refresh_token = encode_jwt(
-        {
-            "sub": str(user.id),
-            "email": user.email,
-            "username": user.username,
-            "token_version": user.token_version
-        }
+    return token_response(
+        issue_access_token(users[0]), "Token refresh success.", refresh_token
     )
 
-    return TokenDTO(
-        access_token=new_refresh_token,
-        token_type="Bearer",
-        info="Token refresh success.",
-    )
+
+@router.get("/me")
+async def read_current_user(claims: dict = Depends(bearer_claims)):
+    """
+    Данные из access-токена; без обращения к БД и dishka.
+    В компактном профиле токена username и email не передаются.
+    """
+    return {
+        "id": claims["sub"],
+        "username": claims.get("username"),
+        "email": claims.get("email"),
+    }
 
 
-@router.delete("/delete")
+@router.delete("/delete", dependencies=[query_budget(6)])
 @inject
 async def delete_user(
     uow: FromDishka[UnitOfWork],
@@ -159,36 +202,34 @@ async def delete_user(
 
 
     await uow.user.drop(user.id)
+    uow.add_event(USER_DELETED, user.id)
     await uow.commit()
     return {"success": True, "message": f"User {user.username} has been deleted."}
 
-@router.patch("/change_password")
+@router.patch("/change_password", dependencies=[query_budget(10)])
 @inject
 async def change_password(
         uow: FromDishka[UnitOfWork],
         data: UpdatePasswordDTO,
+        idempotency_key: IdempotencyKey = None,
 ):
+    idempotent = IdempotentRequest(uow, "change_password", idempotency_key, data)
+    if (record := await idempotent.replay()) is not None:
+        return await replay_token_response(uow, record)
+
     user = await get_user_by_login(uow, data)
     user.password = hash_pwd(data.new_password)
     user.token_version += 1
     await uow.user.update(user)
-    await uow.commit()
-    new_refresh_token = encode_jwt(
-        {
-            "sub": str(user.id),
-            "email": user.email,
-            "username": user.username,
-            "token_version": user.token_version
-        }
-    )
+    await uow.refresh_token.revoke_for_user(user.id)
+    uow.add_event(USER_PASSWORD_CHANGED, user.id, token_version=user.token_version)
+    refresh_token = await issue_refresh_token(uow, user.id)
+    info = "Password changed successfully."
+    await idempotent.commit(token_outcome(user, info))
 
-    return TokenDTO(
-        access_token=new_refresh_token,
-        token_type="Bearer",
-        info="Password changed successfully."
-    )
+    return token_response(issue_access_token(user), info, refresh_token)
 
-@router.patch("/update_user")
+@router.patch("/update_user", dependencies=[query_budget(7)])
 @inject
 async def update_user(
         uow: FromDishka[UnitOfWork],
@@ -208,19 +249,17 @@ async def update_user(
         user.password = hash_pwd(updates.password)
     user.token_version += 1
     await uow.user.update(user)
+    await uow.refresh_token.revoke_for_user(user.id)
+    uow.add_event(
+        USER_UPDATED,
+        user.id,
+        fields=sorted(updates.model_dump(exclude_none=True)),
+        token_version=user.token_version,
+    )
+    refresh_token = await issue_refresh_token(uow, user.id)
     await uow.commit()
 
-    new_refresh_token = encode_jwt(
-        {
-            "sub": str(user.id),
-            "email": user.email,
-            "username": user.username,
-            "token_version": user.token_version
-        }
-    )
-    return TokenDTO(
-        access_token=new_refresh_token,
-        token_type="Bearer",
-        info="User was updated",
+    return token_response(
+        issue_access_token(user), "User was updated", refresh_token
     )
 
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+
+from src.app.api.v1.admin import verify_admin_key
+from src.app.middleware.query_stats import db_metrics
+
+router = APIRouter()
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        return ORJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up"},
+        )
+    return {"status": "ready"}
+
+
+# Счётчики раскрывают маршруты и нагрузку на БД - только с X-Admin-Key.
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(verify_admin_key)],
+)
+async def metrics():
+    return db_metrics.render()
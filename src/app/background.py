@@ -0,0 +1,132 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+
+from dishka import AsyncContainer
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import Settings
+from src.core.notifier import change_notifier
+from src.infrastructure.postgres.maintenance import (
+    maintain_login_history_partitions, prune_idempotency_keys,
+    prune_outbox_events)
+from src.infrastructure.postgres.outbox import (listen_change_events,
+                                                publish_outbox_events)
+from src.infrastructure.postgres.uow import UnitOfWork
+from src.services.token_epoch import load_token_epoch
+
+
+async def run_periodically(
+    name: str,
+    func: Callable[[], Awaitable[None]],
+    interval: float,
+) -> None:
+    while True:
+        try:
+            await func()
+        except Exception:
+            logger.exception(f"Background task {name} failed.")
+        await asyncio.sleep(interval)
+
+
+async def refresh_token_epoch(container: AsyncContainer) -> None:
+    async with container() as request_container:
+        await load_token_epoch(await request_container.get(UnitOfWork))
+
+
+async def refresh_login_rollup(container: AsyncContainer, settings: Settings) -> None:
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork)
+        rows = await uow.login_analytics.refresh_rollup(
+            timedelta(seconds=settings.login_rollup_lag_sec)
+        )
+        await uow.commit()
+    if rows:
+        logger.info(f"Login rollup refreshed: {rows} rows upserted.")
+
+
+async def start_background_tasks(
+    container: AsyncContainer,
+    settings: Settings,
+) -> list[asyncio.Task]:
+    tasks = [
+        asyncio.create_task(
+            run_periodically(
+                "token_epoch",
+                lambda: refresh_token_epoch(container),
+                settings.token_epoch_refresh_sec,
+            )
+        ),
+    ]
+    if settings.storage_backend == "postgres":
+        engine = await container.get(AsyncEngine)
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "login_history_partitions",
+                    lambda: maintain_login_history_partitions(engine, settings),
+                    settings.maintenance_interval_sec,
+                )
+            )
+        )
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "idempotency_keys",
+                    lambda: prune_idempotency_keys(engine),
+                    settings.maintenance_interval_sec,
+                )
+            )
+        )
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "login_rollup",
+                    lambda: refresh_login_rollup(container, settings),
+                    settings.login_rollup_interval_sec,
+                )
+            )
+        )
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "outbox_publisher",
+                    lambda: publish_outbox_events(engine, settings.outbox_batch_size),
+                    settings.outbox_publish_interval_sec,
+                )
+            )
+        )
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "outbox_events",
+                    lambda: prune_outbox_events(engine, settings),
+                    settings.maintenance_interval_sec,
+                )
+            )
+        )
+        # Через PgBouncer в режиме transaction pooling LISTEN не работает:
+        # SSE-потоки тогда опрашивают outbox раз в OUTBOX_KEEPALIVE_SEC.
+        if settings.pg_pool_mode == "direct":
+            tasks.append(
+                asyncio.create_task(
+                    run_periodically(
+                        "change_events_listener",
+                        lambda: listen_change_events(
+                            engine,
+                            lambda _: change_notifier.notify(),
+                            settings.outbox_keepalive_sec,
+                            on_connect=change_notifier.notify,
+                        ),
+                        settings.outbox_keepalive_sec,
+                    )
+                )
+            )
+    return tasks
+
+
+async def stop_background_tasks(tasks: list[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,180 @@
+"""
+Массовый импорт пользователей из CSV или NDJSON.
+
+    python -m src.app.commands.import_users users.csv [--duplicates dup.ndjson]
+
+Колонки / ключи: username, email, password, first_name, last_name.
+Пароли хешируются bcrypt в пуле процессов; значения, которые уже являются
+bcrypt-хешами, сохраняются как есть. Строки загружаются пачками через COPY.
+"""
+import argparse
+import asyncio
+import csv
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import UTC, datetime
+from itertools import islice
+from uuid import uuid4
+
+import orjson
+from dishka import AsyncContainer, make_async_container
+from loguru import logger
+from pydantic import ValidationError
+
+from src.app.dto.authorization import CreateUserDTO
+from src.core.config import Settings
+from src.domain.entities.user import User
+from src.domain.entities.user_import import BulkImportResult
+from src.infrastructure.ioc_container import SessionProvider, UowProvider
+from src.infrastructure.postgres.uow import UnitOfWork
+from src.services.jwt_utils import hash_pwd, is_bcrypt_hash
+
+
+def read_rows(path: str, file_format: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield orjson.loads(line)
+
+
+def parse_users(rows: Iterable[dict]) -> Iterator[User]:
+    now = datetime.now(UTC)
+    for line_number, row in enumerate(rows, start=1):
+        row = {key: value if value != "" else None for key, value in row.items()}
+        try:
+            data = CreateUserDTO.model_validate(row)
+        except ValidationError as err:
+            logger.warning(f"Row {line_number} skipped: {err.errors()}")
+            continue
+        yield User(
+            id=uuid4(),
+            username=data.username,
+            first_name=data.first_name,
+            last_name=data.last_name,
+            password=data.password,
+            email=str(data.email),
+            created_at=now,
+        )
+
+
+def batched(users: Iterable[User], size: int) -> Iterator[list[User]]:
+    iterator = iter(users)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def prepare_passwords(passwords: list[str]) -> list[str]:
+    return [p if is_bcrypt_hash(p) else hash_pwd(p) for p in passwords]
+
+
+async def hash_batch(
+    pool: ProcessPoolExecutor,
+    batch: list[User],
+    workers: int,
+) -> list[User]:
+    loop = asyncio.get_running_loop()
+    chunk_size = -(-len(batch) // workers)
+    passwords = [user.password for user in batch]
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                pool, prepare_passwords, passwords[i: i + chunk_size]
+            )
+            for i in range(0, len(passwords), chunk_size)
+        )
+    )
+    hashed = [password for chunk in chunks for password in chunk]
+    return [replace(user, password=p) for user, p in zip(batch, hashed)]
+
+
+async def load_batch(container: AsyncContainer, batch: list[User]) -> BulkImportResult:
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork)
+        result = await uow.user.bulk_create(batch)
+        await uow.commit()
+    return result
+
+
+async def import_users(
+    container: AsyncContainer,
+    users: Iterable[User],
+    batch_size: int,
+    workers: int,
+) -> BulkImportResult:
+    total = BulkImportResult()
+
+    def collect(result: BulkImportResult) -> None:
+        total.inserted += result.inserted
+        total.duplicates.extend(result.duplicates)
+        logger.info(
+            f"Imported {total.inserted} users, {len(total.duplicates)} duplicates."
+        )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Пока пачка загружается через COPY, следующая уже хешируется.
+        loading = None
+        for batch in batched(users, batch_size):
+            hashing = asyncio.ensure_future(hash_batch(pool, batch, workers))
+            if loading is not None:
+                collect(await load_batch(container, loading))
+            loading = await hashing
+        if loading is not None:
+            collect(await load_batch(container, loading))
+    return total
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings = Settings()
+    workers = args.workers or settings.import_hash_workers or os.cpu_count() or 1
+    container = make_async_container(
+        SessionProvider(),
+        UowProvider(),
+        context={Settings: settings},
+    )
+    try:
+        users = parse_users(read_rows(args.path, args.format))
+        result = await import_users(
+            container, users, args.batch_size or settings.import_batch_size, workers
+        )
+    finally:
+        await container.close()
+
+    if args.duplicates:
+        with open(args.duplicates, "wb") as file:
+            for duplicate in result.duplicates:
+                file.write(
+                    orjson.dumps(
+                        {
+                            "username": duplicate.username,
+                            "email": duplicate.email,
+                            "conflicts": duplicate.conflicts,
+                        },
+                        option=orjson.OPT_APPEND_NEWLINE,
+                    )
+                )
+    logger.info(
+        f"Done: {result.inserted} inserted, {len(result.duplicates)} duplicates."
+    )
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk import users.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "ndjson"))
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--duplicates", help="NDJSON file for rejected rows.")
+    args = parser.parse_args(argv)
+    if args.format is None:
+        args.format = "csv" if args.path.endswith(".csv") else "ndjson"
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args(sys.argv[1:])))
@@ -0,0 +1,109 @@
+from datetime import UTC, date, datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import (AwareDatetime, BaseModel, Field, field_validator,
+                      model_validator)
+
+from src.core.config import settings
+
+
+class BatchLookupDTO(BaseModel):
+    ids: List[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.batch_lookup_max_ids,
+        description="Id пользователей. Результаты возвращаются в том же порядке.",
+    )
+
+
+class UserInfoDTO(BaseModel):
+    id: UUID
+    username: str
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+    token_version: int = 0
+
+
+class UserLookupResultDTO(BaseModel):
+    id: UUID
+    found: bool
+    user: Optional[UserInfoDTO] = None
+
+
+class BatchLookupResultDTO(BaseModel):
+    results: List[UserLookupResultDTO]
+
+
+class RevokeSessionsDTO(BaseModel):
+    ids: Optional[List[UUID]] = Field(
+        default=None,
+        min_length=1,
+        max_length=settings.bulk_revoke_max_ids,
+    )
+    created_before: Optional[AwareDatetime] = None
+
+    @model_validator(mode="after")
+    def require_condition(self):
+        if self.ids is None and self.created_before is None:
+            raise ValueError(
+                "Specify ids or created_before; use not-before to revoke all tokens."
+            )
+        return self
+
+
+class RevokeSessionsResultDTO(BaseModel):
+    users: int
+    refresh_tokens: int
+
+
+class TokenEpochDTO(BaseModel):
+    not_before: Optional[datetime] = None
+
+
+class SetTokenEpochDTO(BaseModel):
+    not_before: Optional[AwareDatetime] = Field(
+        default=None,
+        description="По умолчанию - текущий момент.",
+    )
+
+    @field_validator("not_before")
+    @classmethod
+    def not_in_future(cls, value: Optional[datetime]) -> Optional[datetime]:
+        if value is not None and value > datetime.now(UTC):
+            raise ValueError("not_before must not be in the future.")
+        return value
+
+
+class DailyLoginsDTO(BaseModel):
+    day: date
+    logins: int
+    users: int
+
+
+class UserAgentLoginsDTO(BaseModel):
+    user_agent: str
+    logins: int
+
+
+class LoginAnalyticsDTO(BaseModel):
+    days: List[DailyLoginsDTO]
+    user_agents: List[UserAgentLoginsDTO]
+
+
+class IntrospectTokenDTO(BaseModel):
+    token: str
+
+
+class TokenIntrospectionDTO(BaseModel):
+    active: bool
+    sub: Optional[UUID] = None
+    ver: Optional[int] = None
+    iat: Optional[int] = None
+    exp: Optional[int] = None
+    username: Optional[str] = None
+    email: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
@@ -1,20 +1,23 @@
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr, model_validator, Field
+from pydantic import BaseModel, model_validator, Field
 
-class UpdateTokenDTO(BaseModel):
-    token: str
+from src.app.dto.types import FastEmailStr
+
+class RefreshTokenDTO(BaseModel):
+    refresh_token: str = Field(..., description="Refresh-токен, выданный при входе или прошлом обновлении.")
 
 
 class CreateUserDTO(BaseModel):
     username: str
-    email: EmailStr
+    email: FastEmailStr
     password: str
     first_name: Optional[str] = None
     last_name: Optional[str] = None
 
 class TokenDTO(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str
     info: Optional[str]
 
@@ -24,7 +27,7 @@ class LoginUserDTO(BaseModel):
         default=None,
         description="Имя пользователя. Укажите либо username, либо email, но не оба."
     )
-    email: Optional[EmailStr] = Field(
+    email: Optional[FastEmailStr] = Field(
         default=None,
         description="Email пользователя. Укажите либо email, либо username, но не оба."
     )
@@ -71,7 +74,7 @@ class UpdatePasswordDTO(LoginUserDTO):
 
 class UserUpdateFields(BaseModel):
     username: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[FastEmailStr] = None
     password: Optional[str] = None
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -0,0 +1,21 @@
+from functools import lru_cache
+from typing import Annotated
+
+from pydantic import AfterValidator, WithJsonSchema
+from pydantic.networks import validate_email
+
+
+# Проверка email через email-validator - самая дорогая часть валидации
+# тел запросов; одни и те же адреса приходят снова и снова (логин, ретраи).
+@lru_cache(maxsize=65536)
+def _validate_email_cached(value: str) -> str:
+    return validate_email(value)[1]
+
+
+# EmailStr с кэшем результатов проверки: та же публичная validate_email,
+# те же ошибки и JSON-схема.
+FastEmailStr = Annotated[
+    str,
+    AfterValidator(_validate_email_cached),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
@@ -1,12 +1,33 @@
+from contextlib import asynccontextmanager
+
 from dishka import make_async_container
 from dishka.integrations.fastapi import setup_dishka
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 
-from src.app.api.v1 import authorization
+from src.app.api.v1 import admin, authorization, health
+from src.app.background import start_background_tasks, stop_background_tasks
+from src.app.middleware.bearer_auth import BearerAuthMiddleware
+from src.app.middleware.query_stats import QueryStatsMiddleware
+from src.app.warmup import warm_up
 from src.core.config import Settings, settings
 from src.core.logger import setup_logging
-from src.infrastructure.ioc_container import SessionProvider, UowProvider
+from src.infrastructure.ioc_container import (MemoryProvider, SessionProvider,
+                                              UowProvider)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    container = app.state.dishka_container
+    app_settings = await container.get(Settings)
+    await warm_up(container, app_settings)
+    tasks = await start_background_tasks(container, app_settings)
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    await stop_background_tasks(tasks)
+    await container.close()
 
 
 def create_app() -> FastAPI:
@@ -15,19 +36,35 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         openapi_url="/api/openapi/",
         default_response_class=ORJSONResponse,
+        lifespan=lifespan,
     )
+    app.state.ready = False
+    app.include_router(health.router)
     app.include_router(authorization.router, prefix="/api/v1/user")
+    app.include_router(admin.router, prefix="/api/v1/admin")
     return app
 
 
+def storage_providers(app_settings: Settings) -> tuple:
+    if app_settings.storage_backend == "memory":
+        return (MemoryProvider(),)
+    return (SessionProvider(), UowProvider())
+
+
 def app_factory():
     setup_logging()
     app = create_app()
+    app_settings = Settings()
     container = make_async_container(
-        SessionProvider(),
-        UowProvider(),
-        context={Settings: Settings()},
+        *storage_providers(app_settings), context={Settings: app_settings}
     )
     setup_dishka(container=container, app=app)
+    # Добавляются после dishka, чтобы стать внешними слоями: неверный токен
+    # отклоняется до создания контейнера запроса, а учёт обращений к БД
+    # охватывает весь запрос.
+    app.add_middleware(BearerAuthMiddleware)
+    app.add_middleware(
+        QueryStatsMiddleware, debug_headers=app_settings.settings_is_debug
+    )
 
-    return app
\ No newline at end of file
+    return app
@@ -0,0 +1,109 @@
+import orjson
+from fastapi import Request
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.services.jwt_utils import (decode_jwt, get_current_user,
+                                    is_token_revoked, parse_bearer)
+
+
+async def bearer_claims(request: Request) -> dict:
+    """
+    Зависимость для маршрутов, которым нужны только claims токена.
+    Объявление её в маршруте включает для него проверку в BearerAuthMiddleware,
+    без middleware (роутер смонтирован в чужом приложении) токен
+    проверяется здесь же.
+    """
+    claims = request.scope.get("auth")
+    if claims is None:
+        claims = get_current_user(request)
+        request.scope["auth"] = claims
+    return claims
+
+
+def _requires_claims(dependant: Dependant) -> bool:
+    return any(
+        dependency.call is bearer_claims or _requires_claims(dependency)
+        for dependency in dependant.dependencies
+    )
+
+
+class BearerAuthMiddleware:
+    """
+    Pure-ASGI проверка bearer-токена для маршрутов, зависящих от bearer_claims.
+    Токен проверяется один раз до роутинга, FastAPI и dishka, claims кладутся
+    в scope["auth"] (доступны как request.auth). Ошибка - сразу 401.
+    Защищённые маршруты собираются при старте приложения и заново, если
+    список маршрутов с тех пор изменился.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes: list | None = None
+        self._route_count = 0
+        self._static_paths: frozenset[str] = frozenset()
+        self._dynamic_routes: list[APIRoute] = []
+
+    def _collect_routes(self, app) -> None:
+        self._routes = app.routes
+        self._route_count = len(self._routes)
+        static_paths, dynamic_routes = set(), []
+        for route in app.routes:
+            if isinstance(route, APIRoute) and _requires_claims(route.dependant):
+                if route.param_convertors:
+                    dynamic_routes.append(route)
+                else:
+                    static_paths.add(route.path)
+        self._dynamic_routes = dynamic_routes
+        self._static_paths = frozenset(static_paths)
+
+    def _is_protected(self, scope: Scope) -> bool:
+        routes = scope["app"].routes
+        if routes is not self._routes or len(routes) != self._route_count:
+            self._collect_routes(scope["app"])
+        if scope["path"] in self._static_paths:
+            return True
+        return any(
+            route.matches(scope)[0] is Match.FULL for route in self._dynamic_routes
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            self._collect_routes(scope["app"])
+        if scope["type"] != "http" or not self._is_protected(scope):
+            return await self.app(scope, receive, send)
+
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
+        token = parse_bearer(auth_header)
+        if token is None:
+            return await self._reject(send, "Authorization header missing or malformed")
+        try:
+            claims = decode_jwt(token)
+        except Exception:
+            return await self._reject(send, "Invalid token")
+        if is_token_revoked(claims):
+            return await self._reject(send, "Token revoked")
+        scope["auth"] = claims
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send: Send, detail: str) -> None:
+        body = orjson.dumps({"detail": detail})
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 401,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"www-authenticate", b"Bearer"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,130 @@
+from collections import defaultdict
+
+from fastapi import Depends, Request
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+from src.infrastructure.postgres.query_stats import (QueryStats,
+                                                     current_query_stats)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class DBMetrics:
+    """Накопленная по маршрутам статистика обращений к БД текущего процесса."""
+
+    _COUNTERS = (
+        ("requests", "Requests handled."),
+        ("statements", "SQL statements executed."),
+        ("rows", "Rows returned or affected."),
+        ("commits", "Transactions committed."),
+        ("time_seconds", "Time spent executing SQL statements."),
+        ("query_budget_exceeded", "Requests over their query budget."),
+    )
+
+    def __init__(self):
+        self._routes: dict[tuple[str, str], dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys((name for name, _ in self._COUNTERS), 0)
+        )
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        stats: QueryStats,
+        budget_exceeded: bool,
+    ) -> None:
+        counters = self._routes[method, route]
+        counters["requests"] += 1
+        counters["statements"] += stats.statements
+        counters["rows"] += stats.rows
+        counters["commits"] += stats.commits
+        counters["time_seconds"] += stats.db_time
+        counters["query_budget_exceeded"] += budget_exceeded
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        for name, description in self._COUNTERS:
+            metric = f"db_{name}_total"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for (method, route), counters in sorted(self._routes.items()):
+                lines.append(
+                    f'{metric}{{method="{method}",route="{route}"}} {counters[name]}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+db_metrics = DBMetrics()
+
+
+def query_budget(max_statements: int):
+    """
+    Зависимость маршрута: не больше `max_statements` SQL-выражений за запрос.
+    При QUERY_BUDGET_ENFORCE превышение - ошибка (в тестах запрос падает),
+    иначе - предупреждение в лог и метрика query_budget_exceeded.
+    """
+
+    async def check_query_budget(request: Request):
+        yield
+        stats = current_query_stats.get()
+        if stats is None or stats.statements <= max_statements:
+            return
+        request.scope["query_budget_exceeded"] = True
+        message = (
+            f"Query budget exceeded for {request.method} {request.url.path}: "
+            f"{stats.statements} statements, budget {max_statements}."
+        )
+        if settings.query_budget_enforce:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    return Depends(check_query_budget)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure-ASGI учёт обращений к БД за запрос: число выражений, строк,
+    коммитов и время в БД. В debug-режиме значения отдаются
+    заголовками X-DB-*, всегда - копятся в db_metrics по шаблону маршрута.
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-queries", str(stats.statements).encode()),
+                    (b"x-db-rows", str(stats.rows).encode()),
+                    (b"x-db-commits", str(stats.commits).encode()),
+                    (b"x-db-time-ms", f"{stats.db_time * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(
+                scope, receive, send_with_headers if self.debug_headers else send
+            )
+        finally:
+            current_query_stats.reset(token)
+            route = scope.get("route")
+            db_metrics.observe(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                stats,
+                scope.get("query_budget_exceeded", False),
+            )
@@ -0,0 +1,110 @@
+"""
+Продакшен-запуск сервиса: `python -m src.app.server`.
+
+Поднимает N процессов uvicorn (по умолчанию - по числу доступных ядер:
+bcrypt выполняется в event loop и нагружает CPU, поэтому один воркер
+занимает одно ядро) и делит бюджет соединений Postgres между ними.
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+import uvicorn
+from loguru import logger
+
+from src.core.config import Settings
+
+APP = "src.app.main:app_factory"
+
+
+def default_workers() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(cpus, 1)
+
+
+def _uvicorn_options(settings: Settings) -> dict:
+    return dict(
+        factory=True,
+        host=settings.server_host,
+        port=settings.server_port,
+        backlog=settings.server_backlog,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        proxy_headers=True,
+        access_log=settings.settings_is_debug,
+    )
+
+
+def _bind_reuse_port(settings: Settings) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((settings.server_host, settings.server_port))
+    sock.listen(settings.server_backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve_reuse_port() -> None:
+    # Каждый воркер слушает свой сокет, ядро само балансирует соединения.
+    settings = Settings()
+    sock = _bind_reuse_port(settings)
+    uvicorn.Server(uvicorn.Config(APP, **_uvicorn_options(settings))).run(
+        sockets=[sock]
+    )
+
+
+def _run_reuse_port(settings: Settings, workers: int) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=_serve_reuse_port) for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    while not stop.wait(1):
+        for index, process in enumerate(processes):
+            if not process.is_alive():
+                logger.warning(
+                    f"Worker {process.pid} exited with {process.exitcode}, restarting."
+                )
+                processes[index] = ctx.Process(target=_serve_reuse_port)
+                processes[index].start()
+
+    # Воркеры перестают принимать соединения и дожидаются текущих запросов.
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(settings.server_graceful_timeout + 5)
+        if process.is_alive():
+            process.kill()
+
+
+def run() -> None:
+    settings = Settings()
+    workers = settings.server_workers or default_workers()
+    # Дочерние процессы читают число воркеров из окружения
+    # и по нему вычисляют свою долю пула соединений.
+    os.environ["SERVER_WORKERS"] = str(workers)
+    settings = Settings()
+    pool_size, max_overflow = settings.pg_pool_limits
+    logger.info(
+        f"Starting {workers} workers, Postgres pool per worker: "
+        f"{pool_size} + {max_overflow} overflow."
+    )
+
+    if settings.server_reuse_port and workers > 1:
+        _run_reuse_port(settings, workers)
+        return
+
+    uvicorn.run(APP, workers=workers, **_uvicorn_options(settings))
+
+
+if __name__ == "__main__":
+    run()
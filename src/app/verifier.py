@@ -0,0 +1,343 @@
+"""
+Проверка access-токенов на Unix-сокете для сервисов на том же хосте:
+`python -m src.app.verifier`.
+
+Протокол - кадры с префиксом длины (u32, big-endian):
+
+    запрос:  <u32 длина><токен>
+    ответ:   <u32 длина><u8 статус><JSON claims>
+
+Claims передаются только при статусе OK (0), коды ошибок - VerifyStatus.
+Ответы приходят в порядке запросов, клиент может отправлять запросы пачкой,
+не дожидаясь ответов: все кадры, прочитанные за один read, проверяются
+вместе и отвечаются одной записью в сокет.
+
+Подпись проверяется теми же decode_jwt и ключами из Settings, граница
+token_epoch перечитывается фоновой задачей. При
+VERIFIER_CHECK_TOKEN_VERSION=true версия токена сверяется с token_version
+пользователя из кэша (только для Postgres): промахи пачки догружаются одним
+запросом, записи обновляются событиями user_changes (массовый отзыв сессий
+по условию сбрасывает кэш целиком). Если версию проверить
+не удалось (БД недоступна), кадры пачки получают статус UNAVAILABLE.
+"""
+import asyncio
+import os
+import signal
+import struct
+import time
+from enum import IntEnum
+from uuid import UUID
+
+import orjson
+from dishka import AsyncContainer, make_async_container
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.app.background import (refresh_token_epoch, run_periodically,
+                                stop_background_tasks)
+from src.app.main import storage_providers
+from src.core.cache import TTLCache
+from src.core.config import Settings
+from src.core.logger import setup_logging
+from src.infrastructure.postgres.outbox import listen_change_events
+from src.infrastructure.postgres.uow import UnitOfWork
+from src.services.change_events import USER_DELETED
+from src.services.jwt_utils import (claims_token_version, decode_jwt,
+                                    is_token_revoked, load_key)
+from src.services.token_epoch import load_token_epoch
+
+FRAME_HEADER = struct.Struct(">I")
+READ_CHUNK_SIZE = 65536
+
+
+class VerifyStatus(IntEnum):
+    OK = 0
+    INVALID = 1
+    REVOKED = 2
+    STALE_VERSION = 3
+    FRAME_TOO_LARGE = 4
+    # Версию токена не удалось проверить (БД недоступна).
+    UNAVAILABLE = 5
+
+
+_DELETED = object()
+
+
+class TokenVersionCache:
+    """
+    token_version пользователей по id; удалённые помечаются отдельно.
+    Кэшу можно доверять, только пока действует подписка на user_changes:
+    без неё версии читаются из БД на каждую пачку, а при (пере)подписке
+    кэш очищается - события, пропущенные без подписки, не потеряются.
+    """
+
+    def __init__(self, container: AsyncContainer, settings: Settings):
+        self._container = container
+        self._chunk_size = settings.batch_lookup_chunk_size
+        self._versions = TTLCache(
+            maxsize=settings.verifier_version_cache_size,
+            ttl=settings.cache_expire_sec,
+        )
+        self._subscribed = False
+        # Загрузка, начатая до очистки, не должна вернуть в кэш старые версии.
+        self._generation = 0
+
+    def _reset(self, subscribed: bool) -> None:
+        self._versions.clear()
+        self._generation += 1
+        self._subscribed = subscribed
+
+    def subscribed(self) -> None:
+        self._reset(True)
+
+    def unsubscribed(self) -> None:
+        self._reset(False)
+
+    async def get_many(self, user_ids: set[UUID]) -> dict[UUID, object]:
+        found = {}
+        if self._subscribed:
+            for user_id in user_ids:
+                version = self._versions.get(user_id)
+                if version is not None:
+                    found[user_id] = version
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        if not missing:
+            return found
+        generation = self._generation
+        async with self._container() as request_container:
+            uow = await request_container.get(UnitOfWork)
+            users = await uow.user.get_many(missing, self._chunk_size)
+        cache = self._subscribed and generation == self._generation
+        for user_id in missing:
+            user = users.get(user_id)
+            found[user_id] = _DELETED if user is None else user.token_version
+            if cache:
+                self._versions.set(user_id, found[user_id])
+        return found
+
+    def apply_events(self, payload: str) -> None:
+        for message in orjson.loads(payload):
+            if message["user_id"] is None:
+                self._apply_bulk_event(message["data"])
+                continue
+            user_id = UUID(message["user_id"])
+            version = message["data"].get("token_version")
+            if message["type"] == USER_DELETED:
+                self._versions.set(user_id, _DELETED)
+            elif version is not None:
+                self._versions.set(user_id, version)
+            else:
+                self._versions.pop(user_id)
+
+    def _apply_bulk_event(self, data: dict) -> None:
+        user_ids = data.get("user_ids")
+        if user_ids is None:
+            # Отзыв по условию: затронутые пользователи неизвестны,
+            # версии перечитываются из БД.
+            self._reset(self._subscribed)
+            return
+        for user_id in user_ids:
+            self._versions.pop(UUID(user_id))
+
+
+def encode_response(status: VerifyStatus, claims: dict | None = None) -> bytes:
+    body = bytes((status,)) + (orjson.dumps(claims) if claims is not None else b"")
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+class TokenVerifier:
+    def __init__(self, settings: Settings, versions: TokenVersionCache | None):
+        self.versions = versions
+        self.max_frame_bytes = settings.verifier_max_frame_bytes
+        self._claims_ttl = settings.cache_expire_sec
+        # Разобранные claims по токену: повторная проверка того же токена
+        # не тратит время на подпись. Граница отзыва и версия сверяются
+        # при каждой проверке.
+        self._claims = TTLCache(
+            maxsize=settings.verifier_claims_cache_size,
+            ttl=settings.cache_expire_sec,
+        )
+
+    def verify_token(self, token: bytes) -> tuple[VerifyStatus, dict | None]:
+        claims = self._claims.get(token)
+        if claims is None:
+            try:
+                claims = decode_jwt(token)
+            except Exception:
+                return VerifyStatus.INVALID, None
+            ttl = self._claims_ttl
+            if "exp" in claims:
+                ttl = min(ttl, claims["exp"] - time.time())
+            if ttl > 0:
+                self._claims.set(token, claims, ttl)
+        if is_token_revoked(claims):
+            return VerifyStatus.REVOKED, None
+        return VerifyStatus.OK, claims
+
+    async def verify_batch(self, tokens: list[bytes]) -> bytes:
+        results = [self.verify_token(token) for token in tokens]
+        if self.versions is not None:
+            await self._check_versions(results)
+        return b"".join(encode_response(status, claims) for status, claims in results)
+
+    async def _check_versions(self, results: list) -> None:
+        user_ids = {}
+        for index, (status, claims) in enumerate(results):
+            if status is VerifyStatus.OK:
+                try:
+                    user_ids[index] = UUID(claims["sub"])
+                except (KeyError, TypeError, ValueError):
+                    results[index] = (VerifyStatus.INVALID, None)
+        try:
+            versions = await self.versions.get_many(set(user_ids.values()))
+        except Exception:
+            logger.exception("Token version lookup failed.")
+            for index in user_ids:
+                results[index] = (VerifyStatus.UNAVAILABLE, None)
+            return
+        for index, user_id in user_ids.items():
+            version = versions.get(user_id)
+            if version is _DELETED or version != claims_token_version(
+                results[index][1]
+            ):
+                results[index] = (VerifyStatus.STALE_VERSION, None)
+
+
+def split_frames(
+    buffer: bytearray,
+    max_frame_bytes: int,
+) -> tuple[list[bytes], int, bool]:
+    """Полные кадры из начала буфера, число разобранных байт и флаг переполнения."""
+    frames, offset = [], 0
+    while len(buffer) - offset >= FRAME_HEADER.size:
+        (length,) = FRAME_HEADER.unpack_from(buffer, offset)
+        if length > max_frame_bytes:
+            return frames, offset, True
+        end = offset + FRAME_HEADER.size + length
+        if end > len(buffer):
+            break
+        frames.append(bytes(buffer[offset + FRAME_HEADER.size: end]))
+        offset = end
+    return frames, offset, False
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    verifier: TokenVerifier,
+) -> None:
+    buffer = bytearray()
+    try:
+        while chunk := await reader.read(READ_CHUNK_SIZE):
+            buffer += chunk
+            frames, offset, too_large = split_frames(buffer, verifier.max_frame_bytes)
+            del buffer[:offset]
+            if frames:
+                writer.write(await verifier.verify_batch(frames))
+            if too_large:
+                # Границу следующего кадра уже не найти - соединение закрывается.
+                writer.write(encode_response(VerifyStatus.FRAME_TOO_LARGE))
+                await writer.drain()
+                return
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def listen_for_versions(
+    engine: AsyncEngine,
+    versions: TokenVersionCache,
+    keepalive: float,
+) -> None:
+    try:
+        await listen_change_events(
+            engine, versions.apply_events, keepalive, on_connect=versions.subscribed
+        )
+    finally:
+        versions.unsubscribed()
+
+
+def start_background_tasks(
+    container: AsyncContainer,
+    settings: Settings,
+    versions: TokenVersionCache | None,
+    engine: AsyncEngine | None,
+) -> list[asyncio.Task]:
+    tasks = [
+        asyncio.create_task(
+            run_periodically(
+                "token_epoch",
+                lambda: refresh_token_epoch(container),
+                settings.token_epoch_refresh_sec,
+            )
+        )
+    ]
+    if versions is not None:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "change_events_listener",
+                    lambda: listen_for_versions(
+                        engine, versions, settings.outbox_keepalive_sec
+                    ),
+                    settings.outbox_keepalive_sec,
+                )
+            )
+        )
+    return tasks
+
+
+async def serve(settings: Settings) -> None:
+    container = make_async_container(
+        *storage_providers(settings), context={Settings: settings}
+    )
+    versions, engine = None, None
+    if settings.verifier_check_token_version:
+        if settings.storage_backend != "postgres":
+            logger.warning("Token version check requires Postgres storage, disabled.")
+        elif settings.pg_pool_mode != "direct":
+            # Через PgBouncer LISTEN не работает, а без событий кэш версий
+            # отвечал бы OK на уже отозванные токены.
+            raise RuntimeError(
+                "VERIFIER_CHECK_TOKEN_VERSION requires POSTGRES_POOL_MODE=direct."
+            )
+        else:
+            engine = await container.get(AsyncEngine)
+            versions = TokenVersionCache(container, settings)
+
+    async with container() as request_container:
+        await load_token_epoch(await request_container.get(UnitOfWork))
+    load_key(settings.public_key, settings.algorithm)
+    tasks = start_background_tasks(container, settings, versions, engine)
+
+    path = settings.verifier_socket_path
+    if os.path.exists(path):
+        os.unlink(path)
+    verifier = TokenVerifier(settings, versions)
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_connection(reader, writer, verifier),
+        path=path,
+    )
+    # Доступ к сокету - у владельца и его группы.
+    os.chmod(path, 0o660)
+    logger.info(f"Token verifier listening on {path}.")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        await stop_background_tasks(tasks)
+        await container.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(serve(Settings()))
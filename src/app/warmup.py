@@ -0,0 +1,58 @@
+import asyncio
+from contextlib import AsyncExitStack
+from uuid import uuid4
+
+from dishka import AsyncContainer
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import Settings
+from src.infrastructure.postgres.repositories.user_repo import UserRepository
+from src.infrastructure.postgres.uow import UnitOfWork
+from src.services.jwt_utils import hash_pwd, load_key
+from src.services.token_epoch import load_token_epoch
+
+
+async def _prime_session(session: AsyncSession) -> None:
+    # Те же запросы, что выполняют эндпоинты: SQLAlchemy кладёт их в кэш
+    # компиляции, asyncpg - в кэш подготовленных выражений соединения.
+    repo = UserRepository(session)
+    await repo.filter(id=uuid4())
+    await repo.filter(username="")
+    await repo.filter(email="")
+
+
+async def warm_up_pool(session_pool: async_sessionmaker, connections: int) -> None:
+    """Открывает `connections` соединений пула одновременно и прогревает каждое."""
+    async with AsyncExitStack() as stack:
+        sessions = [
+            await stack.enter_async_context(session_pool())
+            for _ in range(connections)
+        ]
+        await asyncio.gather(*(_prime_session(session) for session in sessions))
+
+
+def warm_up_crypto(settings: Settings) -> None:
+    load_key(settings.private_key, settings.algorithm)
+    load_key(settings.public_key, settings.algorithm)
+    hash_pwd("warmup")
+
+
+async def warm_up(container: AsyncContainer, settings: Settings) -> None:
+    """
+    Прогрев воркера перед приёмом трафика:
+    граф зависимостей dishka, граница отзыва токенов, соединения пула,
+    кэш выражений, ключи подписи и bcrypt.
+    """
+    async with container() as request_container:
+        await load_token_epoch(await request_container.get(UnitOfWork))
+
+    connections = 0
+    if settings.storage_backend == "postgres":
+        connections = min(settings.warmup_connections, sum(settings.pg_pool_limits))
+    if connections > 0:
+        session_pool = await container.get(async_sessionmaker)
+        await warm_up_pool(session_pool, connections)
+
+    await asyncio.to_thread(warm_up_crypto, settings)
+    logger.info(f"Warm-up finished ({connections} connections).")
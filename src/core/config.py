@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,6 +22,23 @@ class Settings(BaseSettings):
     pg_user: str = Field(default="user", alias="POSTGRES_USER")
     pg_password: str = Field(default="password", alias="POSTGRES_PASSWORD")
     pg_echo: bool = Field(default=True, alias="POSTGRES_ECHO")
+    # direct - прямое подключение к Postgres, pgbouncer - через PgBouncer
+    # в режиме transaction pooling (без кэша подготовленных выражений asyncpg).
+    pg_pool_mode: Literal["direct", "pgbouncer"] = Field(
+        default="direct", alias="POSTGRES_POOL_MODE"
+    )
+    pg_statement_cache_size: int = Field(
+        default=100, alias="POSTGRES_STATEMENT_CACHE_SIZE"
+    )
+    pg_prepared_statement_cache_size: int = Field(
+        default=100, alias="POSTGRES_PREPARED_STATEMENT_CACHE_SIZE"
+    )
+    # PgBouncer >= 1.21 с max_prepared_statements > 0 поддерживает
+    # подготовленные выражения протокола - тогда их можно кэшировать.
+    pg_pgbouncer_prepared_statements: bool = Field(
+        default=False, alias="POSTGRES_PGBOUNCER_PREPARED_STATEMENTS"
+    )
+    pg_pool_pre_ping: bool = Field(default=True, alias="POSTGRES_POOL_PRE_PING")
 
     cache_expire_sec: int = Field(default=300, alias="CACHE_EXPIRE_SEC")
     page_size: int = Field(default=100, alias="PAGE_SIZE")
@@ -29,13 +47,104 @@ class Settings(BaseSettings):
     public_key: str = Field(default=public_key_gl, alias="PUBLIC_KEY_GL")
 
     algorithm: str = Field(default="RS256", alias="ALGORITHM")
+    token_profile: Literal["full", "compact"] = Field(
+        default="full", alias="TOKEN_PROFILE"
+    )
     access_token_expire_minutes: int = Field(
         default=15, alias="ACCESS_TOKEN_EXPIRE_MINUTES"
     )
+    refresh_token_expire_days: int = Field(
+        default=30, alias="REFRESH_TOKEN_EXPIRE_DAYS"
+    )
+    refresh_token_cache_size: int = Field(
+        default=100_000, alias="REFRESH_TOKEN_CACHE_SIZE"
+    )
+
+    warmup_connections: int = Field(default=5, alias="WARMUP_CONNECTIONS")
+
+    server_host: str = Field(default="0.0.0.0", alias="SERVER_HOST")
+    server_port: int = Field(default=8000, alias="SERVER_PORT")
+    server_workers: int | None = Field(default=None, alias="SERVER_WORKERS")
+    server_reuse_port: bool = Field(default=False, alias="SERVER_REUSE_PORT")
+    server_backlog: int = Field(default=2048, alias="SERVER_BACKLOG")
+    server_graceful_timeout: int = Field(default=30, alias="SERVER_GRACEFUL_TIMEOUT")
+    pg_pool_budget: int = Field(default=100, alias="POSTGRES_POOL_BUDGET")
+
+    fast_serialization: bool = Field(default=False, alias="FAST_SERIALIZATION")
+
+    token_epoch_refresh_sec: float = Field(default=5, alias="TOKEN_EPOCH_REFRESH_SEC")
+    bulk_revoke_max_ids: int = Field(default=100000, alias="BULK_REVOKE_MAX_IDS")
+
+    idempotency_ttl_sec: int = Field(default=86400, alias="IDEMPOTENCY_TTL_SEC")
+    idempotency_cache_size: int = Field(default=10000, alias="IDEMPOTENCY_CACHE_SIZE")
+    # Ключ HMAC отпечатка тела запроса; по умолчанию выводится из PRIVATE_KEY_GL.
+    idempotency_secret: str | None = Field(default=None, alias="IDEMPOTENCY_SECRET")
+
+    # Outbox событий об изменениях пользователей.
+    outbox_publish_interval_sec: float = Field(
+        default=1, alias="OUTBOX_PUBLISH_INTERVAL_SEC"
+    )
+    outbox_batch_size: int = Field(default=500, alias="OUTBOX_BATCH_SIZE")
+    outbox_retention_hours: int = Field(default=72, alias="OUTBOX_RETENTION_HOURS")
+    outbox_keepalive_sec: float = Field(default=15, alias="OUTBOX_KEEPALIVE_SEC")
+
+    # Сервер проверки токенов на Unix-сокете (python -m src.app.verifier).
+    verifier_socket_path: str = Field(
+        default="/tmp/auth-verifier.sock", alias="VERIFIER_SOCKET_PATH"
+    )
+    verifier_max_frame_bytes: int = Field(
+        default=8192, alias="VERIFIER_MAX_FRAME_BYTES"
+    )
+    verifier_check_token_version: bool = Field(
+        default=False, alias="VERIFIER_CHECK_TOKEN_VERSION"
+    )
+    verifier_version_cache_size: int = Field(
+        default=100000, alias="VERIFIER_VERSION_CACHE_SIZE"
+    )
+    verifier_claims_cache_size: int = Field(
+        default=10000, alias="VERIFIER_CLAIMS_CACHE_SIZE"
+    )
+
+    query_budget_enforce: bool = Field(default=False, alias="QUERY_BUDGET_ENFORCE")
+
+    storage_backend: Literal["postgres", "memory"] = Field(
+        default="postgres", alias="STORAGE_BACKEND"
+    )
+
+    login_history_enabled: bool = Field(default=False, alias="LOGIN_HISTORY_ENABLED")
+    login_history_retention_days: int = Field(
+        default=180, alias="LOGIN_HISTORY_RETENTION_DAYS"
+    )
+    login_history_partitions_ahead: int = Field(
+        default=3, alias="LOGIN_HISTORY_PARTITIONS_AHEAD"
+    )
+    maintenance_interval_sec: int = Field(default=3600, alias="MAINTENANCE_INTERVAL_SEC")
+    login_rollup_interval_sec: int = Field(
+        default=300, alias="LOGIN_ROLLUP_INTERVAL_SEC"
+    )
+    login_rollup_lag_sec: int = Field(default=60, alias="LOGIN_ROLLUP_LAG_SEC")
+
+    admin_api_key: str | None = Field(default=None, alias="ADMIN_API_KEY")
+    export_fetch_size: int = Field(default=1000, alias="EXPORT_FETCH_SIZE")
+    batch_lookup_max_ids: int = Field(default=1000, alias="BATCH_LOOKUP_MAX_IDS")
+    batch_lookup_chunk_size: int = Field(default=500, alias="BATCH_LOOKUP_CHUNK_SIZE")
+
+    import_batch_size: int = Field(default=5000, alias="IMPORT_BATCH_SIZE")
+    import_hash_workers: int | None = Field(default=None, alias="IMPORT_HASH_WORKERS")
 
     @property
     def async_db_url(self):
         return f"postgresql+asyncpg://{self.pg_user}:{self.pg_password}@{self.pg_host}:{self.pg_port}/{self.pg_name}"
 
+    @property
+    def pg_pool_limits(self) -> tuple[int, int]:
+        """
+        Делит общий бюджет соединений Postgres между воркерами.
+        Возвращает (pool_size, max_overflow) для одного процесса.
+        """
+        per_worker = max(self.pg_pool_budget // (self.server_workers or 1), 1)
+        pool_size = max(per_worker // 2, 1)
+        return pool_size, per_worker - pool_size
+
 
 settings = Settings()
@@ -0,0 +1,31 @@
+import asyncio
+
+
+class Notifier:
+    """
+    Сигнал "что-то изменилось" для корутин процесса. Ожидающий берёт
+    waiter() до проверки данных, поэтому сигнал, пришедший между проверкой
+    и ожиданием, не теряется.
+    """
+
+    def __init__(self):
+        self._event = asyncio.Event()
+
+    def notify(self) -> None:
+        self._event.set()
+        self._event = asyncio.Event()
+
+    def waiter(self) -> asyncio.Event:
+        return self._event
+
+    @staticmethod
+    async def wait(waiter: asyncio.Event, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+
+# Публикация событий outbox (см. src/services/change_events.py).
+change_notifier = Notifier()
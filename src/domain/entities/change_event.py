@@ -0,0 +1,26 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(slots=True)
+class ChangeEvent:
+    event_type: str
+    # None у массовых событий: затронутые пользователи перечислены в data.
+    user_id: Optional[uuid.UUID]
+    data: dict = field(default_factory=dict)
+    id: Optional[int] = None
+    # Порядковый номер публикации - курсор для потребителей.
+    position: Optional[int] = None
+    created_at: Optional[datetime] = None
+    published_at: Optional[datetime] = None
+
+    def to_message(self) -> dict:
+        return {
+            "position": self.position,
+            "type": self.event_type,
+            "user_id": str(self.user_id) if self.user_id is not None else None,
+            "data": self.data,
+            "created_at": self.created_at,
+        }
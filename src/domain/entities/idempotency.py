@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+
+@dataclass(slots=True)
+class IdempotencyRecord:
+    scope: str
+    key: str
+    request_hash: str
+    status_code: int
+    # Несекретный итог запроса: по нему повтор выпускает новые токены.
+    outcome: dict
+    expires_at: datetime
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def create(
+            cls,
+            scope: str,
+            key: str,
+            request_hash: str,
+            outcome: dict,
+            lifetime: timedelta,
+            status_code: int = 200,
+    ) -> "IdempotencyRecord":
+        now = datetime.now(UTC)
+        return cls(
+            scope=scope,
+            key=key,
+            request_hash=request_hash,
+            status_code=status_code,
+            outcome=outcome,
+            expires_at=now + lifetime,
+            created_at=now,
+        )
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at <= datetime.now(UTC)
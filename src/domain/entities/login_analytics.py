@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass(slots=True)
+class DailyLogins:
+    day: date
+    logins: int
+    users: int
+
+
+@dataclass(slots=True)
+class UserAgentLogins:
+    user_agent: str
+    logins: int
@@ -0,0 +1,37 @@
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+
+@dataclass(slots=True)
+class RefreshToken:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    family_id: uuid.UUID
+    token_hash: str
+    expires_at: datetime
+    created_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
+
+    @classmethod
+    def create(
+            cls,
+            user_id: uuid.UUID,
+            token_hash: str,
+            lifetime: timedelta,
+            family_id: Optional[uuid.UUID] = None,
+    ) -> "RefreshToken":
+        now = datetime.now(UTC)
+        return cls(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            family_id=family_id or uuid.uuid4(),
+            token_hash=token_hash,
+            expires_at=now + lifetime,
+            created_at=now,
+        )
+
+    @property
+    def is_active(self) -> bool:
+        return self.revoked_at is None and self.expires_at > datetime.now(UTC)
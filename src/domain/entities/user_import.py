@@ -0,0 +1,15 @@
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass(slots=True)
+class DuplicateUser:
+    username: str
+    email: str
+    conflicts: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class BulkImportResult:
+    inserted: int = 0
+    duplicates: List[DuplicateUser] = field(default_factory=list)
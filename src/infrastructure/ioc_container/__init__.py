@@ -1,4 +1,5 @@
+from .memory_provider import MemoryProvider
 from .session_provider import SessionProvider
 from .uow_provider import UowProvider
 
-__all__ = ["SessionProvider", "UowProvider"]
\ No newline at end of file
+__all__ = ["MemoryProvider", "SessionProvider", "UowProvider"]
@@ -0,0 +1,20 @@
+from dishka import Provider, Scope, from_context, provide
+
+from src.core.config import Settings
+from src.infrastructure.memory.storage import InMemoryStorage
+from src.infrastructure.memory.uow import InMemoryUnitOfWork
+from src.infrastructure.postgres.uow import UnitOfWork
+
+
+class MemoryProvider(Provider):
+    """Подменяет Postgres-хранилище: UnitOfWork разрешается в InMemoryUnitOfWork."""
+
+    settings = from_context(provides=Settings, scope=Scope.APP)
+
+    @provide(scope=Scope.APP)
+    async def storage(self) -> InMemoryStorage:
+        return InMemoryStorage()
+
+    @provide(scope=Scope.REQUEST, provides=UnitOfWork)
+    async def get_uow(self, storage: InMemoryStorage) -> InMemoryUnitOfWork:
+        return InMemoryUnitOfWork(storage)
@@ -1,10 +1,56 @@
 from collections.abc import AsyncIterable
+from uuid import uuid4
 
 from dishka import Provider, Scope, from_context, provide
 from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
                                     async_sessionmaker, create_async_engine)
 
 from src.core.config import Settings
+from src.infrastructure.postgres.query_stats import instrument_engine
+
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_connect_args(settings: Settings) -> dict:
+    """
+    Параметры asyncpg для выбранного режима подключения.
+
+    В режиме pgbouncer (transaction pooling) серверное соединение меняется
+    между транзакциями, поэтому кэш выражений asyncpg отключается, а имена
+    подготовленных выражений делаются уникальными, чтобы не конфликтовать
+    с выражениями других клиентов.
+    """
+    if settings.pg_pool_mode == "pgbouncer":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": (
+                settings.pg_prepared_statement_cache_size
+                if settings.pg_pgbouncer_prepared_statements
+                else 0
+            ),
+            "prepared_statement_name_func": _prepared_statement_name,
+        }
+    return {
+        "statement_cache_size": settings.pg_statement_cache_size,
+        "prepared_statement_cache_size": settings.pg_prepared_statement_cache_size,
+    }
+
+
+def build_engine(settings: Settings) -> AsyncEngine:
+    pool_size, max_overflow = settings.pg_pool_limits
+    engine = create_async_engine(
+        settings.async_db_url,
+        echo=settings.pg_echo,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=30,
+        pool_pre_ping=settings.pg_pool_pre_ping,
+        connect_args=engine_connect_args(settings),
+    )
+    instrument_engine(engine)
+    return engine
 
 
 class SessionProvider(Provider):
@@ -12,14 +58,7 @@ class SessionProvider(Provider):
 
     @provide(scope=Scope.APP)
     async def engine(self, settings: Settings) -> AsyncIterable[AsyncEngine]:
-        engine = create_async_engine(
-            settings.async_db_url,
-            echo=True,
-            pool_size=50,
-            max_overflow=50,
-            pool_timeout=30,
-            pool_pre_ping=True,
-        )
+        engine = build_engine(settings)
         yield engine
         await engine.dispose()
 
@@ -33,4 +72,4 @@ class SessionProvider(Provider):
         session_poll: async_sessionmaker,
     ) -> AsyncIterable[AsyncSession]:
         async with session_poll() as session:
-            yield session
\ No newline at end of file
+            yield session
@@ -1,10 +1,17 @@
+from collections.abc import AsyncIterable
+
 from dishka import Provider, Scope, provide
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from src.infrastructure.postgres.uow import UnitOfWork
 
 
 class UowProvider(Provider):
     @provide(scope=Scope.REQUEST)
-    async def get_uow(self, session: AsyncSession) -> UnitOfWork:
-        return UnitOfWork(session)
\ No newline at end of file
+    async def get_uow(
+        self,
+        session_poll: async_sessionmaker,
+    ) -> AsyncIterable[UnitOfWork]:
+        uow = UnitOfWork(session_poll)
+        yield uow
+        await uow.close()
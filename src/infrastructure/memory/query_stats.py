@@ -0,0 +1,58 @@
+import functools
+import inspect
+
+from src.infrastructure.postgres.query_stats import record_statement
+
+
+def count_statements(cls):
+    """
+    Декоратор in-memory репозитория: каждый внешний вызов публичного
+    метода учитывается как одно SQL-выражение, как если бы его выполнил
+    Postgres-репозиторий. Это нижняя граница числа выражений Postgres,
+    которой хватает, чтобы query_budget ловил запросы в цикле без БД.
+    Вызовы методов репозитория изнутри других его методов не считаются.
+    """
+    cls._statement_depth = 0
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(method):
+            setattr(cls, name, _counted(method))
+        elif inspect.isasyncgenfunction(method):
+            setattr(cls, name, _counted_generator(method))
+    return cls
+
+
+def _counted(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if self._statement_depth == 0:
+            record_statement()
+        self._statement_depth += 1
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            self._statement_depth -= 1
+
+    return wrapper
+
+
+def _counted_generator(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if self._statement_depth == 0:
+            record_statement()
+        items = method(self, *args, **kwargs)
+        while True:
+            # Глубина - только на время шага: между шагами генератор
+            # может потребляться из другой задачи.
+            self._statement_depth += 1
+            try:
+                item = await anext(items)
+            except StopAsyncIteration:
+                return
+            finally:
+                self._statement_depth -= 1
+            yield item
+
+    return wrapper
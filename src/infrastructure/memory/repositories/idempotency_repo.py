@@ -0,0 +1,24 @@
+from dataclasses import replace
+
+from src.domain.entities.idempotency import IdempotencyRecord
+from src.infrastructure.memory.query_stats import count_statements
+from src.infrastructure.memory.storage import InMemoryStorage
+
+
+@count_statements
+class InMemoryIdempotencyRepository:
+    def __init__(self, storage: InMemoryStorage):
+        self.storage = storage
+
+    async def lock(self, scope: str, key: str) -> None:
+        # Запросы в памяти не уступают управление между проверкой и записью.
+        pass
+
+    async def get(self, scope: str, key: str) -> IdempotencyRecord | None:
+        record = self.storage.idempotency_records.get((scope, key))
+        if record is None or record.is_expired:
+            return None
+        return replace(record)
+
+    async def save(self, record: IdempotencyRecord) -> None:
+        self.storage.idempotency_records[record.scope, record.key] = replace(record)
@@ -0,0 +1,61 @@
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from uuid import UUID
+
+from src.domain.entities.login_analytics import DailyLogins, UserAgentLogins
+from src.infrastructure.memory.query_stats import count_statements
+from src.infrastructure.memory.storage import InMemoryStorage
+
+
+@count_statements
+class InMemoryLoginAnalyticsRepository:
+    """Считает агрегаты прямо по истории входов: отдельная сводка не нужна."""
+
+    def __init__(self, storage: InMemoryStorage):
+        self.storage = storage
+
+    async def refresh_rollup(self, lag: timedelta) -> int | None:
+        return 0
+
+    def _logins(self, date_from: date, date_to: date, user_id: UUID | None):
+        histories = (
+            self.storage.login_history.items()
+            if user_id is None
+            else [(user_id, self.storage.login_history.get(user_id, []))]
+        )
+        for history_user_id, history in histories:
+            for entry in history:
+                if date_from <= entry.login_date.date() <= date_to:
+                    yield history_user_id, entry
+
+    async def daily_logins(
+        self,
+        date_from: date,
+        date_to: date,
+        user_id: UUID | None = None,
+    ) -> list[DailyLogins]:
+        logins, users = Counter(), defaultdict(set)
+        for history_user_id, entry in self._logins(date_from, date_to, user_id):
+            day = entry.login_date.date()
+            logins[day] += 1
+            users[day].add(history_user_id)
+        return [
+            DailyLogins(day=day, logins=logins[day], users=len(users[day]))
+            for day in sorted(logins)
+        ]
+
+    async def top_user_agents(
+        self,
+        date_from: date,
+        date_to: date,
+        limit: int = 10,
+        user_id: UUID | None = None,
+    ) -> list[UserAgentLogins]:
+        logins = Counter(
+            entry.user_agent or ""
+            for _, entry in self._logins(date_from, date_to, user_id)
+        )
+        return [
+            UserAgentLogins(user_agent=user_agent, logins=count)
+            for user_agent, count in logins.most_common(limit)
+        ]
@@ -0,0 +1,43 @@
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import replace
+from datetime import UTC, datetime
+
+from src.core.notifier import change_notifier
+from src.domain.entities.change_event import ChangeEvent
+from src.infrastructure.memory.query_stats import count_statements
+from src.infrastructure.memory.storage import InMemoryStorage
+
+
+@count_statements
+class InMemoryOutboxRepository:
+    """События публикуются сразу при записи: публикатор не нужен."""
+
+    def __init__(self, storage: InMemoryStorage):
+        self.storage = storage
+
+    async def add_many(self, events: Sequence[ChangeEvent]) -> None:
+        now = datetime.now(UTC)
+        for event in events:
+            position = next(self.storage.outbox_positions)
+            self.storage.outbox_events.append(
+                replace(
+                    event,
+                    id=position,
+                    position=position,
+                    created_at=now,
+                    published_at=now,
+                )
+            )
+        change_notifier.notify()
+
+    async def published_after(self, position: int, limit: int) -> list[ChangeEvent]:
+        events = self.storage.outbox_events
+        start = bisect_right(events, position, key=lambda event: event.position)
+        return events[start: start + limit]
+
+    async def bounds(self) -> tuple[int | None, int | None]:
+        events = self.storage.outbox_events
+        if not events:
+            return None, None
+        return events[0].position, events[-1].position
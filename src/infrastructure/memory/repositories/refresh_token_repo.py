@@ -0,0 +1,86 @@
+from collections.abc import Sequence
+from dataclasses import fields, replace
+from datetime import UTC, datetime
+from uuid import UUID
+
+from src.domain.entities.refresh_token import RefreshToken
+from src.infrastructure.memory.query_stats import count_statements
+from src.infrastructure.memory.storage import InMemoryStorage
+from src.infrastructure.postgres.exceptions import (RecordNotFoundError,
+                                                    RepoTypes)
+from src.infrastructure.postgres.repositories.base import BaseRepositoryABC
+
+_TOKEN_FIELDS = frozenset(f.name for f in fields(RefreshToken))
+
+
+@count_statements
+class InMemoryRefreshTokenRepository(BaseRepositoryABC):
+    def __init__(self, storage: InMemoryStorage):
+        self.storage = storage
+
+    async def create(self, entity: RefreshToken) -> RefreshToken:
+        self.storage.refresh_tokens[entity.id] = replace(entity)
+        self.storage.refresh_token_ids_by_hash[entity.token_hash] = entity.id
+        return entity
+
+    async def get(self, **filters) -> RefreshToken:
+        tokens = await self.filter(**filters)
+        if not tokens:
+            raise RecordNotFoundError(RepoTypes.REFRESHTOKENSQL.name, filters)
+        return tokens[0]
+
+    async def filter(self, **filters) -> list[RefreshToken]:
+        filters = {k: v for k, v in filters.items() if k in _TOKEN_FIELDS}
+        if "token_hash" in filters:
+            token_id = self.storage.refresh_token_ids_by_hash.get(filters["token_hash"])
+            candidates = [self.storage.refresh_tokens.get(token_id)]
+        else:
+            candidates = list(self.storage.refresh_tokens.values())
+        return [
+            replace(token)
+            for token in candidates
+            if token is not None
+            and all(getattr(token, k) == v for k, v in filters.items())
+        ]
+
+    async def update(self, entity: RefreshToken) -> RefreshToken:
+        if entity.id not in self.storage.refresh_tokens:
+            raise RecordNotFoundError(RepoTypes.REFRESHTOKENSQL.name, str(entity.id))
+        return await self.create(entity)
+
+    async def drop(self, token_id: UUID | str) -> None:
+        if isinstance(token_id, str):
+            token_id = UUID(token_id)
+        token = self.storage.refresh_tokens.pop(token_id, None)
+        if token is None:
+            raise RecordNotFoundError(RepoTypes.REFRESHTOKENSQL.name, str(token_id))
+        self.storage.refresh_token_ids_by_hash.pop(token.token_hash, None)
+
+    async def consume(self, token_hash: str) -> RefreshToken | None:
+        token_id = self.storage.refresh_token_ids_by_hash.get(token_hash)
+        token = self.storage.refresh_tokens.get(token_id)
+        if token is None or not token.is_active:
+            return None
+        token.revoked_at = datetime.now(UTC)
+        return replace(token)
+
+    async def revoke_family(self, family_id: UUID) -> int:
+        return self._revoke(lambda token: token.family_id == family_id)
+
+    async def revoke_for_user(self, user_id: UUID | str) -> int:
+        if isinstance(user_id, str):
+            user_id = UUID(user_id)
+        return self._revoke(lambda token: token.user_id == user_id)
+
+    async def revoke_for_users(self, user_ids: Sequence[UUID]) -> int:
+        user_ids = set(user_ids)
+        return self._revoke(lambda token: token.user_id in user_ids)
+
+    def _revoke(self, predicate) -> int:
+        now = datetime.now(UTC)
+        revoked = 0
+        for token in self.storage.refresh_tokens.values():
+            if token.revoked_at is None and predicate(token):
+                token.revoked_at = now
+                revoked += 1
+        return revoked
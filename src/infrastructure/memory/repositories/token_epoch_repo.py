@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from src.infrastructure.memory.query_stats import count_statements
+from src.infrastructure.memory.storage import InMemoryStorage
+
+
+@count_statements
+class InMemoryTokenEpochRepository:
+    def __init__(self, storage: InMemoryStorage):
+        self.storage = storage
+
+    async def get(self) -> datetime | None:
+        return self.storage.token_not_before
+
+    async def set(self, not_before: datetime) -> datetime:
+        self.storage.token_not_before = not_before
+        return not_before
@@ -0,0 +1,202 @@
+import bisect
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import fields, replace
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy.exc import IntegrityError
+
+from src.domain.entities.login_history import LoginHistory
+from src.domain.entities.user import User
+from src.domain.entities.user_import import BulkImportResult, DuplicateUser
+from src.infrastructure.memory.query_stats import count_statements
+from src.infrastructure.memory.storage import InMemoryStorage
+from src.infrastructure.postgres.exceptions import (RecordCreationError,
+                                                    RecordNotFoundError,
+                                                    RepoTypes)
+from src.infrastructure.postgres.repositories.base import BaseRepositoryABC
+
+_USER_FIELDS = frozenset(f.name for f in fields(User))
+
+
+def _as_uuid(value: UUID | str) -> UUID:
+    return UUID(value) if isinstance(value, str) else value
+
+
+@count_statements
+class InMemoryUserRepository(BaseRepositoryABC):
+    """
+    Повторяет контракт UserRepository на словарях InMemoryStorage.
+    Наружу отдаются копии сущностей, как и при чтении из БД.
+    """
+
+    def __init__(self, storage: InMemoryStorage):
+        self.storage = storage
+
+    async def create(self, entity: User) -> User:
+        if (
+            entity.id in self.storage.users
+            or entity.username in self.storage.user_ids_by_username
+            or entity.email in self.storage.user_ids_by_email
+        ):
+            raise RecordCreationError(RepoTypes.USERSQL.name, {"id": str(entity.id)})
+        self._store(replace(entity, login_history=[]))
+        return replace(entity, login_history=[])
+
+    async def bulk_create(self, entities: Sequence[User]) -> BulkImportResult:
+        result = BulkImportResult()
+        for entity in entities:
+            conflicts = self._conflicts(entity)
+            if conflicts:
+                result.duplicates.append(
+                    DuplicateUser(entity.username, entity.email, conflicts)
+                )
+                continue
+            self._store(replace(entity, login_history=[]))
+            result.inserted += 1
+        return result
+
+    async def get(self, **filters) -> User:
+        users = await self.filter(**filters)
+        if not users:
+            raise RecordNotFoundError(RepoTypes.USERSQL.name, filters)
+        return users[0]
+
+    async def filter(self, **filters) -> list[User]:
+        filters = {k: v for k, v in filters.items() if k in _USER_FIELDS}
+        if "id" in filters:
+            candidates = [self.storage.users.get(_as_uuid(filters.pop("id")))]
+        elif "username" in filters:
+            user_id = self.storage.user_ids_by_username.get(filters.pop("username"))
+            candidates = [self.storage.users.get(user_id)]
+        elif "email" in filters:
+            user_id = self.storage.user_ids_by_email.get(filters.pop("email"))
+            candidates = [self.storage.users.get(user_id)]
+        else:
+            candidates = list(self.storage.users.values())
+        return [
+            replace(user)
+            for user in candidates
+            if user is not None
+            and all(getattr(user, k) == v for k, v in filters.items())
+        ]
+
+    async def get_many(
+        self,
+        ids: Sequence[UUID | str],
+        chunk_size: int = 500,
+    ) -> dict[UUID, User]:
+        found = {}
+        for user_id in map(_as_uuid, ids):
+            user = self.storage.users.get(user_id)
+            if user is not None:
+                found[user_id] = replace(user)
+        return found
+
+    async def stream(self, fetch_size: int = 1000, **filters) -> AsyncIterator[User]:
+        for user in await self.filter(**filters):
+            yield user
+
+    async def update(self, user_entity: User) -> User:
+        user_id = _as_uuid(user_entity.id)
+        current = self.storage.users.get(user_id)
+        if current is None:
+            raise RecordNotFoundError(RepoTypes.USERSQL.name, str(user_id))
+        conflicts = self._conflicts(user_entity, user_id)
+        if conflicts:
+            # Как и UPDATE в Postgres: нарушение уникальности - IntegrityError,
+            # индексы и запись пользователя остаются прежними.
+            name = conflicts[0]
+            raise IntegrityError(
+                'UPDATE "user"',
+                {name: getattr(user_entity, name)},
+                Exception(
+                    "duplicate key value violates unique constraint "
+                    f'"user_{name}_key"'
+                ),
+            )
+        self._unindex(current)
+        self._store(replace(user_entity, id=user_id, login_history=[]))
+        return replace(self.storage.users[user_id])
+
+    async def bump_token_versions(
+        self,
+        ids: Sequence[UUID | str] | None = None,
+        created_before: datetime | None = None,
+    ) -> list[UUID]:
+        if ids is None:
+            candidates = list(self.storage.users.values())
+        else:
+            candidates = [
+                self.storage.users[user_id]
+                for user_id in dict.fromkeys(map(_as_uuid, ids))
+                if user_id in self.storage.users
+            ]
+        bumped = []
+        for user in candidates:
+            if created_before is None or (
+                user.created_at is not None and user.created_at < created_before
+            ):
+                user.token_version += 1
+                bumped.append(user.id)
+        return bumped
+
+    async def drop(self, user_id: UUID | str) -> None:
+        user_id = _as_uuid(user_id)
+        user = self.storage.users.pop(user_id, None)
+        if user is None:
+            raise RecordNotFoundError(RepoTypes.USERSQL.name, str(user_id))
+        self._unindex(user)
+
+    async def add_login_history(
+        self,
+        user_id: UUID | str,
+        user_agent: str | None,
+        extra_data: dict | None = None,
+    ) -> None:
+        user_id = _as_uuid(user_id)
+        entry = LoginHistory(
+            id=next(self.storage.login_history_ids),
+            user_id=user_id,
+            user_agent=user_agent,
+            login_date=datetime.now(UTC).replace(tzinfo=None),
+        )
+        history = self.storage.login_history.setdefault(user_id, [])
+        bisect.insort(history, entry, key=lambda item: item.login_date)
+
+    async def get_with_login_history(
+        self,
+        user_id: UUID | str,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> tuple[User, int]:
+        user_id = _as_uuid(user_id)
+        user = self.storage.users.get(user_id)
+        if user is None:
+            raise RecordNotFoundError(RepoTypes.USERSQL.name, str(user_id))
+        history = self.storage.login_history.get(user_id, [])
+        newest_first = history[::-1][offset: offset + limit]
+        return replace(user, login_history=newest_first), len(history)
+
+    async def get_by_id(self, *, user_id: UUID | str) -> User:
+        return await self.get(id=_as_uuid(user_id))
+
+    def _conflicts(self, entity: User, user_id: UUID | None = None) -> list[str]:
+        """Уникальные поля entity, уже занятые пользователем, отличным от user_id."""
+        return [
+            name
+            for name, index, value in (
+                ("username", self.storage.user_ids_by_username, entity.username),
+                ("email", self.storage.user_ids_by_email, entity.email),
+            )
+            if index.get(value, user_id) != user_id
+        ]
+
+    def _store(self, user: User) -> None:
+        self.storage.users[user.id] = user
+        self.storage.user_ids_by_username[user.username] = user.id
+        self.storage.user_ids_by_email[user.email] = user.id
+
+    def _unindex(self, user: User) -> None:
+        self.storage.user_ids_by_username.pop(user.username, None)
+        self.storage.user_ids_by_email.pop(user.email, None)
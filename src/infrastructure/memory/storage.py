@@ -0,0 +1,34 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import count
+from uuid import UUID
+
+from src.domain.entities.change_event import ChangeEvent
+from src.domain.entities.idempotency import IdempotencyRecord
+from src.domain.entities.login_history import LoginHistory
+from src.domain.entities.refresh_token import RefreshToken
+from src.domain.entities.user import User
+
+
+@dataclass
+class InMemoryStorage:
+    """
+    Данные in-memory бэкенда, общие для всех запросов процесса.
+    Индексы повторяют уникальные ограничения таблицы "user".
+    """
+
+    users: dict[UUID, User] = field(default_factory=dict)
+    user_ids_by_username: dict[str, UUID] = field(default_factory=dict)
+    user_ids_by_email: dict[str, UUID] = field(default_factory=dict)
+    # История входов каждого пользователя, упорядоченная по login_date.
+    login_history: dict[UUID, list[LoginHistory]] = field(default_factory=dict)
+    login_history_ids: count = field(default_factory=lambda: count(1))
+    refresh_tokens: dict[UUID, RefreshToken] = field(default_factory=dict)
+    refresh_token_ids_by_hash: dict[str, UUID] = field(default_factory=dict)
+    token_not_before: datetime | None = None
+    idempotency_records: dict[tuple[str, str], IdempotencyRecord] = field(
+        default_factory=dict
+    )
+    # Опубликованные события outbox в порядке position.
+    outbox_events: list[ChangeEvent] = field(default_factory=list)
+    outbox_positions: count = field(default_factory=lambda: count(1))
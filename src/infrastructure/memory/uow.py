@@ -0,0 +1,58 @@
+from functools import cached_property
+
+from src.infrastructure.memory.repositories.idempotency_repo import \
+    InMemoryIdempotencyRepository
+from src.infrastructure.memory.repositories.login_analytics_repo import \
+    InMemoryLoginAnalyticsRepository
+from src.infrastructure.memory.repositories.outbox_repo import \
+    InMemoryOutboxRepository
+from src.infrastructure.memory.repositories.refresh_token_repo import \
+    InMemoryRefreshTokenRepository
+from src.infrastructure.memory.repositories.token_epoch_repo import \
+    InMemoryTokenEpochRepository
+from src.infrastructure.memory.repositories.user_repo import \
+    InMemoryUserRepository
+from src.infrastructure.memory.storage import InMemoryStorage
+from src.infrastructure.postgres.uow import UnitOfWork
+
+
+class InMemoryUnitOfWork(UnitOfWork):
+    """
+    UnitOfWork поверх InMemoryStorage для тестов и бенчмарков без БД.
+    Подменяются только репозитории; события outbox, commit и rollback
+    наследуются. Изменения применяются сразу, поэтому commit только
+    записывает накопленные события, rollback их отбрасывает. Сессии нет:
+    репозиторий, не переопределённый здесь, падает при первом обращении.
+    """
+
+    def __init__(self, storage: InMemoryStorage):
+        super().__init__(session_factory=None)
+        self.storage = storage
+
+    @cached_property
+    def session(self):
+        raise NotImplementedError("In-memory storage has no database session.")
+
+    @cached_property
+    def user(self) -> InMemoryUserRepository:
+        return InMemoryUserRepository(self.storage)
+
+    @cached_property
+    def refresh_token(self) -> InMemoryRefreshTokenRepository:
+        return InMemoryRefreshTokenRepository(self.storage)
+
+    @cached_property
+    def token_epoch(self) -> InMemoryTokenEpochRepository:
+        return InMemoryTokenEpochRepository(self.storage)
+
+    @cached_property
+    def login_analytics(self) -> InMemoryLoginAnalyticsRepository:
+        return InMemoryLoginAnalyticsRepository(self.storage)
+
+    @cached_property
+    def idempotency(self) -> InMemoryIdempotencyRepository:
+        return InMemoryIdempotencyRepository(self.storage)
+
+    @cached_property
+    def outbox(self) -> InMemoryOutboxRepository:
+        return InMemoryOutboxRepository(self.storage)
@@ -19,6 +19,10 @@ class ErrorMessages(Enum):
 
 class RepoTypes(Enum):
     USERSQL = auto()
+    REFRESHTOKENSQL = auto()
+    TOKENEPOCHSQL = auto()
+    IDEMPOTENCYKEYSQL = auto()
+    OUTBOXEVENTSQL = auto()
 
 
 class BaseRepositoryError(Exception):
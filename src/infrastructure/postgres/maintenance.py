@@ -0,0 +1,100 @@
+from datetime import UTC, date, datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import Settings
+
+LOGIN_HISTORY_PARTITION_PREFIX = "login_history_p"
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _partition_month(name: str) -> date | None:
+    suffix = name.removeprefix(LOGIN_HISTORY_PARTITION_PREFIX)
+    try:
+        return datetime.strptime(suffix, "%Y%m").date()
+    except ValueError:
+        return None
+
+
+async def maintain_login_history_partitions(
+    engine: AsyncEngine,
+    settings: Settings,
+) -> None:
+    """
+    Создаёт помесячные секции login_history на текущий и
+    LOGIN_HISTORY_PARTITIONS_AHEAD следующих месяцев и удаляет секции,
+    целиком вышедшие за срок хранения LOGIN_HISTORY_RETENTION_DAYS.
+    Удаление секции - это DROP TABLE без построчного DELETE и раздувания таблицы.
+    """
+    today = datetime.now(UTC).date()
+    cutoff = today - timedelta(days=settings.login_history_retention_days)
+
+    async with engine.begin() as conn:
+        # Обслуживание запускается в каждом воркере - выполняем его по очереди.
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext('login_history_partitions'))")
+        )
+        existing = set(
+            (
+                await conn.scalars(
+                    text(
+                        "SELECT c.relname FROM pg_inherits i "
+                        "JOIN pg_class c ON c.oid = i.inhrelid "
+                        "WHERE i.inhparent = CAST('login_history' AS regclass)"
+                    )
+                )
+            ).all()
+        )
+
+        month = today.replace(day=1)
+        for _ in range(settings.login_history_partitions_ahead + 1):
+            name = f"{LOGIN_HISTORY_PARTITION_PREFIX}{month:%Y%m}"
+            if name not in existing:
+                await conn.execute(
+                    text(
+                        f'CREATE TABLE "{name}" PARTITION OF login_history '
+                        f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+                    )
+                )
+                logger.info(f"Created partition {name}.")
+            month = _next_month(month)
+
+        for name in sorted(existing):
+            month = _partition_month(name)
+            if month is not None and _next_month(month) <= cutoff:
+                await conn.execute(text(f'DROP TABLE "{name}"'))
+                logger.info(f"Dropped expired partition {name}.")
+
+
+async def prune_idempotency_keys(engine: AsyncEngine) -> None:
+    """Удаляет просроченные ключи идемпотентности (индекс по expires_at)."""
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text("DELETE FROM idempotency_key WHERE expires_at <= now()")
+        )
+    if result.rowcount:
+        logger.info(f"Pruned {result.rowcount} expired idempotency keys.")
+
+
+async def prune_outbox_events(engine: AsyncEngine, settings: Settings) -> None:
+    """
+    Удаляет опубликованные события старше OUTBOX_RETENTION_HOURS.
+    Последнее событие сохраняется всегда: по нему потребитель с
+    устаревшим курсором понимает, что пропустил события.
+    """
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text(
+                "DELETE FROM outbox_event "
+                "WHERE published_at < now() - make_interval(hours => :hours) "
+                "AND position < (SELECT max(position) FROM outbox_event)"
+            ),
+            {"hours": settings.outbox_retention_hours},
+        )
+    if result.rowcount:
+        logger.info(f"Pruned {result.rowcount} published outbox events.")
@@ -0,0 +1,43 @@
+"""outbox_event
+
+Revision ID: 4d8e2b6a1c57
+Revises: 0a9d3e6c2f71
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8e2b6a1c57'
+down_revision: Union[str, Sequence[str], None] = '0a9d3e6c2f71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('outbox_event_position_seq')))
+    op.create_table('outbox_event',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('position', sa.BigInteger(), nullable=True),
+    sa.Column('event_type', sa.String(length=64), nullable=False),
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('published_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('position')
+    )
+    op.create_index('ix_outbox_event_unpublished', 'outbox_event', ['id'], unique=False, postgresql_where=sa.text('position IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_event_unpublished', table_name='outbox_event', postgresql_where=sa.text('position IS NULL'))
+    op.drop_table('outbox_event')
+    op.execute(sa.schema.DropSequence(sa.Sequence('outbox_event_position_seq')))
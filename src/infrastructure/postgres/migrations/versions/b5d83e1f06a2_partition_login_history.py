@@ -0,0 +1,130 @@
+"""partition login_history by login_date
+
+Revision ID: b5d83e1f06a2
+Revises: 7c1e2a9b4f3d
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d83e1f06a2'
+down_revision: Union[str, Sequence[str], None] = '7c1e2a9b4f3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Дальнейшие секции создаёт задача обслуживания (LOGIN_HISTORY_PARTITIONS_AHEAD).
+PARTITIONS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE login_history RENAME TO login_history_legacy")
+    op.execute(
+        "ALTER TABLE login_history_legacy "
+        "RENAME CONSTRAINT login_history_pkey TO login_history_legacy_pkey"
+    )
+    op.execute(
+        "ALTER TABLE login_history_legacy "
+        "RENAME CONSTRAINT login_history_user_id_fkey TO login_history_legacy_user_id_fkey"
+    )
+    op.execute("ALTER TABLE login_history_legacy ALTER COLUMN id DROP DEFAULT")
+    op.execute("ALTER SEQUENCE login_history_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE login_history_id_seq AS bigint")
+
+    op.execute(
+        """
+        CREATE TABLE login_history (
+            id bigint NOT NULL DEFAULT nextval('login_history_id_seq'),
+            user_id uuid REFERENCES "user" (id),
+            user_agent text,
+            login_date timestamp without time zone NOT NULL
+                DEFAULT timezone('utc', now()),
+            extra_data json,
+            CONSTRAINT login_history_pkey PRIMARY KEY (id, login_date)
+        ) PARTITION BY RANGE (login_date)
+        """
+    )
+    op.execute("ALTER SEQUENCE login_history_id_seq OWNED BY login_history.id")
+    op.execute(
+        "CREATE INDEX ix_login_history_user_id_login_date "
+        "ON login_history (user_id, login_date)"
+    )
+
+    # Помесячные секции: от самой старой записи до PARTITIONS_AHEAD месяцев вперёд.
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month timestamp := date_trunc(
+                'month',
+                coalesce(
+                    (SELECT min(login_date) FROM login_history_legacy),
+                    timezone('utc', now())
+                )
+            );
+            last_month timestamp := date_trunc('month', timezone('utc', now()))
+                + interval '{PARTITIONS_AHEAD} months';
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF login_history FOR VALUES FROM (%L) TO (%L)',
+                    'login_history_p' || to_char(month, 'YYYYMM'),
+                    month,
+                    month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO login_history (id, user_id, user_agent, login_date, extra_data)
+        SELECT id, user_id, user_agent,
+               coalesce(login_date, timezone('utc', now())), extra_data
+        FROM login_history_legacy
+        """
+    )
+    op.execute("DROP TABLE login_history_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE login_history RENAME TO login_history_partitioned")
+    op.execute(
+        "ALTER TABLE login_history_partitioned "
+        "RENAME CONSTRAINT login_history_pkey TO login_history_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE login_history_partitioned "
+        "RENAME CONSTRAINT login_history_user_id_fkey TO login_history_partitioned_user_id_fkey"
+    )
+    op.execute("ALTER TABLE login_history_partitioned ALTER COLUMN id DROP DEFAULT")
+    op.execute("ALTER SEQUENCE login_history_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE login_history_id_seq AS integer")
+    op.execute(
+        """
+        CREATE TABLE login_history (
+            id integer NOT NULL DEFAULT nextval('login_history_id_seq'),
+            user_id uuid REFERENCES "user" (id),
+            user_agent text,
+            login_date timestamp without time zone,
+            extra_data json,
+            CONSTRAINT login_history_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE login_history_id_seq OWNED BY login_history.id")
+    op.execute(
+        """
+        INSERT INTO login_history (id, user_id, user_agent, login_date, extra_data)
+        SELECT id, user_id, user_agent, login_date, extra_data
+        FROM login_history_partitioned
+        """
+    )
+    op.execute("DROP TABLE login_history_partitioned")
@@ -0,0 +1,33 @@
+"""token_epoch
+
+Revision ID: e3a7c9d51b20
+Revises: b5d83e1f06a2
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c9d51b20'
+down_revision: Union[str, Sequence[str], None] = 'b5d83e1f06a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('token_epoch',
+    sa.Column('id', sa.SmallInteger(), nullable=False),
+    sa.Column('not_before', sa.DateTime(timezone=True), nullable=False),
+    sa.CheckConstraint('id = 1', name='token_epoch_single_row'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('token_epoch')
@@ -0,0 +1,62 @@
+"""login_analytics
+
+Revision ID: f1c4b7e2a903
+Revises: e3a7c9d51b20
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c4b7e2a903'
+down_revision: Union[str, Sequence[str], None] = 'e3a7c9d51b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Тип меняется на секционированной таблице и распространяется на все секции.
+    op.alter_column('login_history', 'extra_data',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               postgresql_using='extra_data::jsonb',
+               existing_nullable=True)
+    op.create_index('ix_login_history_extra_data', 'login_history', ['extra_data'], unique=False, postgresql_using='gin', postgresql_ops={'extra_data': 'jsonb_path_ops'})
+    op.create_index('ix_login_history_login_date_brin', 'login_history', ['login_date'], unique=False, postgresql_using='brin')
+
+    op.create_table('login_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('user_agent', sa.Text(), server_default='', nullable=False),
+    sa.Column('logins', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day', 'user_id', 'user_agent')
+    )
+    op.create_index('ix_login_daily_stats_user_id_day', 'login_daily_stats', ['user_id', 'day'], unique=False)
+    op.create_table('login_rollup_state',
+    sa.Column('id', sa.SmallInteger(), nullable=False),
+    sa.Column('watermark', sa.DateTime(), nullable=False),
+    sa.CheckConstraint('id = 1', name='login_rollup_state_single_row'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('login_rollup_state')
+    op.drop_index('ix_login_daily_stats_user_id_day', table_name='login_daily_stats')
+    op.drop_table('login_daily_stats')
+
+    op.drop_index('ix_login_history_login_date_brin', table_name='login_history', postgresql_using='brin')
+    op.drop_index('ix_login_history_extra_data', table_name='login_history', postgresql_using='gin', postgresql_ops={'extra_data': 'jsonb_path_ops'})
+    op.alter_column('login_history', 'extra_data',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.JSON(),
+               postgresql_using='extra_data::json',
+               existing_nullable=True)
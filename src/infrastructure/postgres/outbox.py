@@ -0,0 +1,131 @@
+import asyncio
+from collections.abc import Callable, Iterator
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.domain.entities.change_event import ChangeEvent
+
+CHANGE_EVENTS_CHANNEL = "user_changes"
+# Полезная нагрузка NOTIFY ограничена 8000 байтами.
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+
+def _notify_payloads(events: list[ChangeEvent]) -> Iterator[str]:
+    chunk, size = [], 2
+    for event in events:
+        message = orjson.dumps(event.to_message())
+        if chunk and size + len(message) + 1 > NOTIFY_PAYLOAD_LIMIT:
+            yield "[" + ",".join(chunk) + "]"
+            chunk, size = [], 2
+        chunk.append(message.decode())
+        size += len(message) + 1
+    if chunk:
+        yield "[" + ",".join(chunk) + "]"
+
+
+async def publish_outbox_events(engine: AsyncEngine, batch_size: int) -> int:
+    """
+    Публикует накопленные события outbox пачками по batch_size.
+
+    Публикатор во всех воркерах один (pg_try_advisory_xact_lock): позиции
+    из outbox_event_position_seq выдаются и фиксируются строго по порядку,
+    так что потребитель, читающий position > курсора, не пропустит событие,
+    закоммиченное позже соседнего. NOTIFY с пачкой событий доставляется
+    слушателям канала user_changes вместе с коммитом.
+    """
+    published = 0
+    while True:
+        async with engine.begin() as conn:
+            locked = await conn.scalar(
+                text("SELECT pg_try_advisory_xact_lock(hashtext('outbox_publisher'))")
+            )
+            if not locked:
+                return published
+            rows = (
+                await conn.execute(
+                    text(
+                        "SELECT id, event_type, user_id, data, created_at "
+                        "FROM outbox_event WHERE position IS NULL "
+                        "ORDER BY id LIMIT :limit FOR UPDATE SKIP LOCKED"
+                    ),
+                    {"limit": batch_size},
+                )
+            ).all()
+            if not rows:
+                return published
+            positions = sorted(
+                (
+                    await conn.scalars(
+                        text(
+                            "SELECT nextval('outbox_event_position_seq') "
+                            "FROM generate_series(1, :count)"
+                        ),
+                        {"count": len(rows)},
+                    )
+                ).all()
+            )
+            await conn.execute(
+                text(
+                    "UPDATE outbox_event AS o "
+                    "SET position = p.position, published_at = now() "
+                    "FROM unnest(CAST(:ids AS bigint[]), CAST(:positions AS bigint[])) "
+                    "AS p(id, position) WHERE o.id = p.id"
+                ),
+                {"ids": [row.id for row in rows], "positions": positions},
+            )
+            events = [
+                ChangeEvent(
+                    id=row.id,
+                    position=position,
+                    event_type=row.event_type,
+                    user_id=row.user_id,
+                    data=row.data,
+                    created_at=row.created_at,
+                )
+                for row, position in zip(rows, positions)
+            ]
+            for payload in _notify_payloads(events):
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": CHANGE_EVENTS_CHANNEL, "payload": payload},
+                )
+        published += len(rows)
+        if len(rows) < batch_size:
+            return published
+
+
+async def listen_change_events(
+    engine: AsyncEngine,
+    on_payload: Callable[[str], None],
+    keepalive: float,
+    on_connect: Callable[[], None] | None = None,
+) -> None:
+    """
+    Держит LISTEN user_changes на отдельном соединении пула и передаёт
+    каждую опубликованную пачку событий (JSON-массив) в on_payload.
+    on_connect вызывается после каждой подписки: уведомления, отправленные,
+    пока соединения не было, потеряны, и подписчик сверяет состояние заново.
+    Соединение проверяется раз в keepalive секунд; при обрыве функция
+    завершается ошибкой и перезапускается фоновой задачей.
+    """
+    async with engine.connect() as conn:
+        raw_connection = await conn.get_raw_connection()
+        # Запросы идут мимо адаптера SQLAlchemy: он открыл бы транзакцию,
+        # а внутри транзакции уведомления не доставляются.
+        driver = raw_connection.driver_connection
+
+        def on_notification(connection, pid, channel, payload: str) -> None:
+            on_payload(payload)
+
+        await driver.add_listener(CHANGE_EVENTS_CHANNEL, on_notification)
+        if on_connect is not None:
+            on_connect()
+        try:
+            while True:
+                await asyncio.sleep(keepalive)
+                await driver.execute("SELECT 1")
+        finally:
+            if not driver.is_closed():
+                await driver.remove_listener(CHANGE_EVENTS_CHANNEL, on_notification)
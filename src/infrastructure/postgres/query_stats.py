@@ -0,0 +1,59 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass(slots=True)
+class QueryStats:
+    statements: int = 0
+    rows: int = 0
+    commits: int = 0
+    db_time: float = 0.0
+
+
+# Статистика текущего запроса; выставляется QueryStatsMiddleware.
+# Вне запроса (прогрев, фоновые задачи) - None, и учёт не ведётся.
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время старта хранится в контексте выполнения: он живёт ровно одно
+    # выражение, и упавший запрос ничего не оставляет на соединении.
+    if context is not None and current_query_stats.get() is not None:
+        context._query_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    started = getattr(context, "_query_start", None)
+    if stats is None or started is None:
+        return
+    stats.db_time += perf_counter() - started
+    stats.statements += 1
+    # rowcount адаптер asyncpg берёт из статуса команды ("SELECT 5",
+    # "UPDATE 2"); у серверного курсора (потоковая выгрузка) он -1,
+    # и такие строки не учитываются.
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def record_commit() -> None:
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.commits += 1
+
+
+def record_statement() -> None:
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.statements += 1
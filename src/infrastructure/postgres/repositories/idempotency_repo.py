@@ -0,0 +1,54 @@
+from dataclasses import asdict
+from datetime import UTC, datetime
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities.idempotency import IdempotencyRecord
+from src.infrastructure.postgres.tables import IdempotencyKeySQL
+
+
+class IdempotencyRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def lock(self, scope: str, key: str) -> None:
+        """
+        Блокировка ключа до конца транзакции: повтор того же запроса
+        дождётся коммита первого и увидит сохранённый итог.
+        """
+        await self.session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:scope), hashtext(:key))"),
+            {"scope": scope, "key": key},
+        )
+
+    async def get(self, scope: str, key: str) -> IdempotencyRecord | None:
+        stmt = select(IdempotencyKeySQL).where(
+            IdempotencyKeySQL.scope == scope,
+            IdempotencyKeySQL.key == key,
+            IdempotencyKeySQL.expires_at > datetime.now(UTC),
+        )
+        record = (await self.session.scalars(stmt)).one_or_none()
+        return self._to_entity(record) if record is not None else None
+
+    async def save(self, record: IdempotencyRecord) -> None:
+        # Просроченная запись с тем же ключом перезаписывается.
+        values = asdict(record)
+        stmt = insert(IdempotencyKeySQL).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["scope", "key"],
+            set_={k: v for k, v in values.items() if k not in ("scope", "key")},
+        )
+        await self.session.execute(stmt)
+
+    def _to_entity(self, orm_record: IdempotencyKeySQL) -> IdempotencyRecord:
+        return IdempotencyRecord(
+            scope=orm_record.scope,
+            key=orm_record.key,
+            request_hash=orm_record.request_hash,
+            status_code=orm_record.status_code,
+            outcome=orm_record.outcome,
+            expires_at=orm_record.expires_at,
+            created_at=orm_record.created_at,
+        )
@@ -0,0 +1,117 @@
+from datetime import UTC, date, datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities.login_analytics import DailyLogins, UserAgentLogins
+from src.infrastructure.postgres.tables import (LoginDailyStatsSQL,
+                                                LoginHistorySQL,
+                                                LoginRollupStateSQL)
+
+
+class LoginAnalyticsRepository:
+    """
+    Аналитика входов по сводке login_daily_stats: запросы дашборда
+    читают O(дней) строк сводки, а не всю login_history.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def refresh_rollup(self, lag: timedelta) -> int | None:
+        """
+        Добавляет в сводку входы с login_date в [watermark, now - lag) одним
+        INSERT ... SELECT ... ON CONFLICT DO UPDATE и сдвигает watermark.
+        Отставание lag даёт закоммититься транзакциям, начатым раньше границы.
+        Чтение сводки не блокируется; из нескольких воркеров обновление
+        выполняет один, остальные получают None. Коммит - за вызывающим.
+        """
+        locked = await self.session.scalar(
+            text("SELECT pg_try_advisory_xact_lock(hashtext('login_rollup'))")
+        )
+        if not locked:
+            return None
+
+        watermark = await self.session.scalar(select(LoginRollupStateSQL.watermark))
+        until = datetime.now(UTC).replace(tzinfo=None) - lag
+        if watermark is not None and watermark >= until:
+            return 0
+
+        day = cast(LoginHistorySQL.login_date, Date)
+        user_agent = func.coalesce(LoginHistorySQL.user_agent, "")
+        new_logins = (
+            select(day, LoginHistorySQL.user_id, user_agent, func.count())
+            .where(
+                LoginHistorySQL.user_id.is_not(None),
+                LoginHistorySQL.login_date < until,
+            )
+            .group_by(day, LoginHistorySQL.user_id, user_agent)
+        )
+        if watermark is not None:
+            new_logins = new_logins.where(LoginHistorySQL.login_date >= watermark)
+
+        upsert = insert(LoginDailyStatsSQL).from_select(
+            ["day", "user_id", "user_agent", "logins"], new_logins
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=["day", "user_id", "user_agent"],
+            set_={"logins": LoginDailyStatsSQL.logins + upsert.excluded.logins},
+        )
+        result = await self.session.execute(upsert)
+
+        state = insert(LoginRollupStateSQL).values(id=1, watermark=until)
+        await self.session.execute(
+            state.on_conflict_do_update(
+                index_elements=["id"], set_={"watermark": until}
+            )
+        )
+        return result.rowcount
+
+    async def daily_logins(
+        self,
+        date_from: date,
+        date_to: date,
+        user_id: UUID | None = None,
+    ) -> list[DailyLogins]:
+        stmt = (
+            select(
+                LoginDailyStatsSQL.day,
+                func.sum(LoginDailyStatsSQL.logins),
+                func.count(LoginDailyStatsSQL.user_id.distinct()),
+            )
+            .where(LoginDailyStatsSQL.day.between(date_from, date_to))
+            .group_by(LoginDailyStatsSQL.day)
+            .order_by(LoginDailyStatsSQL.day)
+        )
+        if user_id is not None:
+            stmt = stmt.where(LoginDailyStatsSQL.user_id == user_id)
+        result = await self.session.execute(stmt)
+        return [
+            DailyLogins(day=day, logins=logins, users=users)
+            for day, logins, users in result.all()
+        ]
+
+    async def top_user_agents(
+        self,
+        date_from: date,
+        date_to: date,
+        limit: int = 10,
+        user_id: UUID | None = None,
+    ) -> list[UserAgentLogins]:
+        logins = func.sum(LoginDailyStatsSQL.logins)
+        stmt = (
+            select(LoginDailyStatsSQL.user_agent, logins)
+            .where(LoginDailyStatsSQL.day.between(date_from, date_to))
+            .group_by(LoginDailyStatsSQL.user_agent)
+            .order_by(logins.desc())
+            .limit(limit)
+        )
+        if user_id is not None:
+            stmt = stmt.where(LoginDailyStatsSQL.user_id == user_id)
+        result = await self.session.execute(stmt)
+        return [
+            UserAgentLogins(user_agent=user_agent, logins=count)
+            for user_agent, count in result.all()
+        ]
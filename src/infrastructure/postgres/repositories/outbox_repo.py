@@ -0,0 +1,55 @@
+from collections.abc import Sequence
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities.change_event import ChangeEvent
+from src.infrastructure.postgres.tables import OutboxEventSQL
+
+
+class OutboxRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_many(self, events: Sequence[ChangeEvent]) -> None:
+        await self.session.execute(
+            insert(OutboxEventSQL),
+            [
+                {
+                    "event_type": event.event_type,
+                    "user_id": event.user_id,
+                    "data": event.data,
+                }
+                for event in events
+            ],
+        )
+
+    async def published_after(self, position: int, limit: int) -> list[ChangeEvent]:
+        stmt = (
+            select(OutboxEventSQL)
+            .where(OutboxEventSQL.position > position)
+            .order_by(OutboxEventSQL.position)
+            .limit(limit)
+        )
+        result = await self.session.scalars(stmt)
+        return [self._to_entity(event) for event in result.all()]
+
+    async def bounds(self) -> tuple[int | None, int | None]:
+        """Первая и последняя позиции опубликованных событий."""
+        result = await self.session.execute(
+            select(
+                func.min(OutboxEventSQL.position), func.max(OutboxEventSQL.position)
+            )
+        )
+        return tuple(result.one())
+
+    def _to_entity(self, orm_event: OutboxEventSQL) -> ChangeEvent:
+        return ChangeEvent(
+            id=orm_event.id,
+            position=orm_event.position,
+            event_type=orm_event.event_type,
+            user_id=orm_event.user_id,
+            data=orm_event.data,
+            created_at=orm_event.created_at,
+            published_at=orm_event.published_at,
+        )
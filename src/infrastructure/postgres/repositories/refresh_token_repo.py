@@ -0,0 +1,121 @@
+from collections.abc import Sequence
+from dataclasses import asdict
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import any_, bindparam, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities.refresh_token import RefreshToken
+from src.infrastructure.postgres.exceptions import (RecordNotFoundError,
+                                                    RepoTypes)
+from src.infrastructure.postgres.repositories.base import BaseRepositoryABC
+from src.infrastructure.postgres.tables import RefreshTokenSQL
+
+
+class RefreshTokenRepository(BaseRepositoryABC):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, entity: RefreshToken) -> RefreshToken:
+        # Все поля заполнены на стороне приложения, refresh после flush не нужен.
+        self.session.add(RefreshTokenSQL(**asdict(entity)))
+        await self.session.flush()
+        return entity
+
+    async def get(self, **filters) -> RefreshToken:
+        tokens = await self.filter(**filters)
+        if not tokens:
+            raise RecordNotFoundError(RepoTypes.REFRESHTOKENSQL.name, filters)
+        return tokens[0]
+
+    async def filter(self, **filters) -> list[RefreshToken]:
+        stmt = select(RefreshTokenSQL)
+        for field, value in filters.items():
+            if hasattr(RefreshTokenSQL, field):
+                stmt = stmt.where(getattr(RefreshTokenSQL, field) == value)
+        result = await self.session.scalars(stmt)
+        return [self._to_entity(t) for t in result.all()]
+
+    async def update(self, entity: RefreshToken) -> RefreshToken:
+        new_data = asdict(entity)
+        token_id = new_data.pop("id")
+        stmt = (
+            update(RefreshTokenSQL)
+            .where(RefreshTokenSQL.id == token_id)
+            .values(**new_data)
+            .returning(RefreshTokenSQL)
+            .execution_options(synchronize_session=False)
+        )
+        token = (await self.session.scalars(stmt)).one_or_none()
+        if token is None:
+            raise RecordNotFoundError(RepoTypes.REFRESHTOKENSQL.name, str(token_id))
+        return self._to_entity(token)
+
+    async def drop(self, token_id: UUID | str) -> None:
+        if isinstance(token_id, str):
+            token_id = UUID(token_id)
+        token = await self.session.get(RefreshTokenSQL, token_id)
+        if token is None:
+            raise RecordNotFoundError(RepoTypes.REFRESHTOKENSQL.name, str(token_id))
+        await self.session.delete(token)
+
+    async def consume(self, token_hash: str) -> RefreshToken | None:
+        """
+        Атомарно гасит активный токен одним UPDATE ... RETURNING.
+        Возвращает None, если токена нет, он просрочен или уже использован.
+        """
+        now = datetime.now(UTC)
+        stmt = (
+            update(RefreshTokenSQL)
+            .where(
+                RefreshTokenSQL.token_hash == token_hash,
+                RefreshTokenSQL.revoked_at.is_(None),
+                RefreshTokenSQL.expires_at > now,
+            )
+            .values(revoked_at=now)
+            .returning(RefreshTokenSQL)
+            .execution_options(synchronize_session=False)
+        )
+        token = (await self.session.scalars(stmt)).one_or_none()
+        return self._to_entity(token) if token is not None else None
+
+    async def revoke_family(self, family_id: UUID) -> int:
+        return await self._revoke(RefreshTokenSQL.family_id == family_id)
+
+    async def revoke_for_user(self, user_id: UUID | str) -> int:
+        if isinstance(user_id, str):
+            user_id = UUID(user_id)
+        return await self._revoke(RefreshTokenSQL.user_id == user_id)
+
+    async def revoke_for_users(self, user_ids: Sequence[UUID]) -> int:
+        return await self._revoke(
+            RefreshTokenSQL.user_id == any_(
+                bindparam(
+                    "user_ids", list(user_ids), type_=ARRAY(PG_UUID(as_uuid=True))
+                )
+            )
+        )
+
+    async def _revoke(self, condition) -> int:
+        stmt = (
+            update(RefreshTokenSQL)
+            .where(condition, RefreshTokenSQL.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(UTC))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    def _to_entity(self, orm_token: RefreshTokenSQL) -> RefreshToken:
+        return RefreshToken(
+            id=orm_token.id,
+            user_id=orm_token.user_id,
+            family_id=orm_token.family_id,
+            token_hash=orm_token.token_hash,
+            expires_at=orm_token.expires_at,
+            created_at=orm_token.created_at,
+            revoked_at=orm_token.revoked_at,
+        )
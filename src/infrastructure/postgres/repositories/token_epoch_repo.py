@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.postgres.tables import TokenEpochSQL
+
+
+class TokenEpochRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self) -> datetime | None:
+        return await self.session.scalar(select(TokenEpochSQL.not_before))
+
+    async def set(self, not_before: datetime) -> datetime:
+        stmt = (
+            insert(TokenEpochSQL)
+            .values(id=1, not_before=not_before)
+            .on_conflict_do_update(
+                index_elements=[TokenEpochSQL.id],
+                set_={"not_before": not_before},
+            )
+        )
+        await self.session.execute(stmt)
+        return not_before
@@ -1,17 +1,40 @@
+from collections.abc import AsyncIterator, Sequence
 from dataclasses import asdict
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import any_, bindparam, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
 from src.domain.entities.login_history import LoginHistory
 from src.domain.entities.user import User
+from src.domain.entities.user_import import BulkImportResult, DuplicateUser
 from src.infrastructure.postgres.exceptions import (RecordNotFoundError,
                                                     RepoTypes)
 from src.infrastructure.postgres.repositories.base import BaseRepositoryABC
 from src.infrastructure.postgres.tables import LoginHistorySQL, UserSQL
 
+IMPORT_COLUMNS = (
+    "id",
+    "username",
+    "first_name",
+    "last_name",
+    "password",
+    "email",
+    "created_at",
+    "token_version",
+)
+_IMPORT_COLUMNS_SQL = ", ".join(IMPORT_COLUMNS)
+
+
+# Один и тот же текст запроса для любого числа id: "id = ANY($1::uuid[])"
+# вместо IN (...) с разным числом параметров, который ломает кэш выражений.
+_GET_MANY_STMT = select(UserSQL).where(
+    UserSQL.id == any_(bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+)
+
 
 class BaseUserRepository(BaseRepositoryABC):
     def __init__(self, session: AsyncSession):
@@ -26,6 +49,62 @@ class BaseUserRepository(BaseRepositoryABC):
         await self.session.refresh(user)
         return self._to_entity(user)
 
+    async def bulk_create(self, entities: Sequence[User]) -> BulkImportResult:
+        """
+        Загружает пачку пользователей через COPY во временную таблицу и переносит
+        в "user" одним INSERT ... ON CONFLICT DO NOTHING. Строки, не прошедшие
+        по уникальным ограничениям (в т.ч. повторы внутри пачки), возвращаются
+        как дубликаты. Пароли должны быть уже захешированы.
+        """
+        await self.session.execute(
+            text(
+                "CREATE TEMP TABLE IF NOT EXISTS user_import_staging "
+                '(LIKE "user" INCLUDING DEFAULTS) ON COMMIT DELETE ROWS'
+            )
+        )
+        conn = await self.session.connection()
+        raw_conn = (await conn.get_raw_connection()).driver_connection
+        await raw_conn.copy_records_to_table(
+            "user_import_staging",
+            records=[
+                tuple(getattr(entity, column) for column in IMPORT_COLUMNS)
+                for entity in entities
+            ],
+            columns=IMPORT_COLUMNS,
+        )
+
+        inserted = await self.session.execute(
+            text(
+                f'INSERT INTO "user" ({_IMPORT_COLUMNS_SQL}) '
+                f"SELECT {_IMPORT_COLUMNS_SQL} FROM user_import_staging "
+                "ON CONFLICT DO NOTHING"
+            )
+        )
+        rejected = await self.session.execute(
+            text(
+                "SELECT s.username, s.email, "
+                '  EXISTS (SELECT 1 FROM "user" u '
+                "          WHERE u.username = s.username AND u.id <> s.id), "
+                '  EXISTS (SELECT 1 FROM "user" u '
+                "          WHERE u.email = s.email AND u.id <> s.id) "
+                "FROM user_import_staging s "
+                'WHERE NOT EXISTS (SELECT 1 FROM "user" u WHERE u.id = s.id)'
+            )
+        )
+        duplicates = [
+            DuplicateUser(
+                username=username,
+                email=email,
+                conflicts=[
+                    name
+                    for name, taken in (("username", username_taken), ("email", email_taken))
+                    if taken
+                ],
+            )
+            for username, email, username_taken, email_taken in rejected.all()
+        ]
+        return BulkImportResult(inserted=inserted.rowcount, duplicates=duplicates)
+
     async def get(self, **filters) -> User:
         users = await self.filter(**filters)
         if not users:
@@ -40,6 +119,41 @@ class BaseUserRepository(BaseRepositoryABC):
         result = await self.session.scalars(stmt)
         return [self._to_entity(u) for u in result.all()]
 
+    async def get_many(
+        self,
+        ids: Sequence[UUID | str],
+        chunk_size: int = 500,
+    ) -> dict[UUID, User]:
+        """
+        Загружает пользователей по списку id: один запрос на каждые
+        chunk_size id. Отсутствующие id в результат не попадают.
+        """
+        unique_ids = list(
+            dict.fromkeys(UUID(i) if isinstance(i, str) else i for i in ids)
+        )
+        found: dict[UUID, User] = {}
+        for start in range(0, len(unique_ids), chunk_size):
+            result = await self.session.scalars(
+                _GET_MANY_STMT, {"ids": unique_ids[start: start + chunk_size]}
+            )
+            for orm_user in result.all():
+                user = self._to_entity(orm_user)
+                found[user.id] = user
+        return found
+
+    async def stream(self, fetch_size: int = 1000, **filters) -> AsyncIterator[User]:
+        """
+        Отдаёт пользователей по мере чтения серверного курсора,
+        не загружая всю выборку в память.
+        """
+        stmt = select(UserSQL).execution_options(yield_per=fetch_size)
+        for field, value in filters.items():
+            if hasattr(UserSQL, field):
+                stmt = stmt.where(getattr(UserSQL, field) == value)
+        result = await self.session.stream_scalars(stmt)
+        async for orm_user in result:
+            yield self._to_entity(orm_user)
+
     async def update(self, user_entity: User) -> User:
         new_data = asdict(user_entity)
         user_id = new_data.pop("id")
@@ -57,6 +171,37 @@ class BaseUserRepository(BaseRepositoryABC):
         await self.session.refresh(user)
         return self._to_entity(user)
 
+    async def bump_token_versions(
+        self,
+        ids: Sequence[UUID | str] | None = None,
+        created_before: datetime | None = None,
+    ) -> list[UUID]:
+        """
+        Увеличивает token_version выбранных пользователей одним UPDATE
+        без загрузки строк. Условия объединяются через AND, без условий
+        затрагиваются все пользователи. Возвращает id изменённых.
+        """
+        stmt = (
+            update(UserSQL)
+            .values(token_version=UserSQL.token_version + 1)
+            .returning(UserSQL.id)
+            .execution_options(synchronize_session=False)
+        )
+        if ids is not None:
+            stmt = stmt.where(
+                UserSQL.id == any_(
+                    bindparam(
+                        "ids",
+                        [UUID(i) if isinstance(i, str) else i for i in ids],
+                        type_=ARRAY(PG_UUID(as_uuid=True)),
+                    )
+                )
+            )
+        if created_before is not None:
+            stmt = stmt.where(UserSQL.created_at < created_before)
+        result = await self.session.scalars(stmt)
+        return [UUID(str(user_id)) for user_id in result.all()]
+
     async def drop(self, user_id: UUID | str) -> None:
         if isinstance(user_id, str):
             user_id = UUID(user_id)
@@ -66,6 +211,22 @@ class BaseUserRepository(BaseRepositoryABC):
             raise RecordNotFoundError(RepoTypes.USERSQL.name, str(user_id))
         await self.session.delete(user)
 
+    async def add_login_history(
+        self,
+        user_id: UUID | str,
+        user_agent: str | None,
+        extra_data: dict | None = None,
+    ) -> None:
+        if isinstance(user_id, str):
+            user_id = UUID(user_id)
+        await self.session.execute(
+            insert(LoginHistorySQL).values(
+                user_id=user_id,
+                user_agent=user_agent,
+                extra_data=extra_data,
+            )
+        )
+
     async def get_with_login_history(
         self,
         user_id: UUID | str,
@@ -73,32 +234,35 @@ class BaseUserRepository(BaseRepositoryABC):
         offset: int = 0,
     ) -> tuple[User, int]:
         """
-        Возвращает пользователя с историей логинов (пагинация).
+        Возвращает пользователя с историей логинов (пагинация, новые первыми).
         Возвращает (User, total_count).
         """
         if isinstance(user_id, str):
             user_id = UUID(user_id)
 
-        # Получаем пользователя + количество логов
+        orm_user = await self.session.get(UserSQL, user_id)
+        if orm_user is None:
+            raise RecordNotFoundError(RepoTypes.USERSQL.name, str(user_id))
+
+        # Оба запроса идут по индексу (user_id, login_date) каждой секции,
+        # в память попадает только запрошенная страница.
         total_stmt = (
-            select(LoginHistorySQL)
+            select(func.count())
+            .select_from(LoginHistorySQL)
             .where(LoginHistorySQL.user_id == user_id)
         )
-        total_count = len((await self.session.scalars(total_stmt)).all())
+        total_count = await self.session.scalar(total_stmt)
 
-        stmt = (
-            select(UserSQL)
-            .where(UserSQL.id == user_id)
-            .options(joinedload(UserSQL.login_history))
+        history_stmt = (
+            select(LoginHistorySQL)
+            .where(LoginHistorySQL.user_id == user_id)
+            .order_by(LoginHistorySQL.login_date.desc())
+            .limit(limit)
+            .offset(offset)
         )
-        orm_user = (await self.session.scalars(stmt)).unique().one_or_none()
-        if orm_user is None:
-            raise RecordNotFoundError(RepoTypes.USERSQL.name, str(user_id))
-
-        # Пагинируем login_history вручную (SQLAlchemy relationship подгрузил всё)
-        paginated_history = orm_user.login_history[offset: offset + limit]
+        history = (await self.session.scalars(history_stmt)).all()
 
-        user_entity = self._to_entity(orm_user, paginated_history)
+        user_entity = self._to_entity(orm_user, history)
         return user_entity, total_count
 
     def _to_entity(self, orm_user: UserSQL, login_history=None) -> User:
@@ -110,6 +274,7 @@ class BaseUserRepository(BaseRepositoryABC):
             password=orm_user.password,
             email=orm_user.email,
             created_at=orm_user.created_at,
+            token_version=orm_user.token_version,
             login_history=[
                 LoginHistory(
                     id=lh.id,
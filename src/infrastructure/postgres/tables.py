@@ -1,9 +1,10 @@
 import uuid
 from datetime import UTC, datetime, timezone
 
-from sqlalchemy import (JSON, Column, DateTime, ForeignKey, Integer, String,
-                        Text)
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (JSON, BigInteger, CheckConstraint, Column, Date,
+                        DateTime, ForeignKey, Index, Integer, Sequence,
+                        SmallInteger, String, Text, text)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
 from src.infrastructure.postgres.base import Base
@@ -23,16 +24,131 @@ class UserSQL(Base):
     token_version = Column(Integer, default=0, nullable=False)
 
 
+class RefreshTokenSQL(Base):
+    __tablename__ = "refresh_token"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class TokenEpochSQL(Base):
+    __tablename__ = "token_epoch"
+    # Одна строка: токены, выпущенные раньше not_before, недействительны.
+    __table_args__ = (CheckConstraint("id = 1", name="token_epoch_single_row"),)
+
+    id = Column(SmallInteger, primary_key=True, default=1)
+    not_before = Column(DateTime(timezone=True), nullable=False)
+
+
+class IdempotencyKeySQL(Base):
+    __tablename__ = "idempotency_key"
+
+    scope = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(SmallInteger, nullable=False)
+    # Только id пользователя, token_version и сообщение - без токенов.
+    outcome = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+OUTBOX_POSITION_SEQ = Sequence("outbox_event_position_seq", metadata=Base.metadata)
+
+
+class OutboxEventSQL(Base):
+    __tablename__ = "outbox_event"
+    # Неопубликованные события выбираются по частичному индексу.
+    __table_args__ = (
+        Index(
+            "ix_outbox_event_unpublished",
+            "id",
+            postgresql_where=text("position IS NULL"),
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    position = Column(BigInteger, nullable=True, unique=True)
+    event_type = Column(String(64), nullable=False)
+    # Без внешнего ключа: событие об удалении переживает пользователя.
+    # Пусто у массовых событий (user.sessions_revoked по условию или пачке id).
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    data = Column(JSON, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
+    published_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class LoginHistorySQL(Base):
     __tablename__ = "login_history"
+    # Таблица секционирована по месяцам login_date, поэтому ключ секционирования
+    # входит в первичный ключ. Секции создаёт и удаляет задача обслуживания.
+    __table_args__ = (
+        Index("ix_login_history_user_id_login_date", "user_id", "login_date"),
+        Index(
+            "ix_login_history_extra_data",
+            "extra_data",
+            postgresql_using="gin",
+            postgresql_ops={"extra_data": "jsonb_path_ops"},
+        ),
+        # Строки добавляются по возрастанию login_date: BRIN занимает считанные
+        # страницы и ускоряет инкрементальное чтение для сводки login_daily_stats.
+        Index(
+            "ix_login_history_login_date_brin", "login_date", postgresql_using="brin"
+        ),
+        {"postgresql_partition_by": "RANGE (login_date)"},
+    )
     id = Column(
-        Integer,
+        BigInteger,
+        Sequence("login_history_id_seq"),
         primary_key=True,
-        autoincrement=True,
         nullable=False,
     )
     user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"))
     user = relationship(UserSQL, back_populates="login_history")
     user_agent = Column(Text)
-    login_date = Column(DateTime, default=datetime.now(UTC))
-    extra_data = Column(JSON, nullable=True)
\ No newline at end of file
+    login_date = Column(
+        DateTime,
+        primary_key=True,
+        nullable=False,
+        default=lambda: datetime.now(UTC).replace(tzinfo=None),
+        server_default=text("timezone('utc', now())"),
+    )
+    extra_data = Column(JSONB, nullable=True)
+
+
+class LoginDailyStatsSQL(Base):
+    __tablename__ = "login_daily_stats"
+    # Сводка login_history по дням (UTC), пользователям и user agent.
+    __table_args__ = (
+        Index("ix_login_daily_stats_user_id_day", "user_id", "day"),
+    )
+
+    day = Column(Date, primary_key=True)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_agent = Column(Text, primary_key=True, server_default="")
+    logins = Column(Integer, nullable=False)
+
+
+class LoginRollupStateSQL(Base):
+    __tablename__ = "login_rollup_state"
+    __table_args__ = (CheckConstraint("id = 1", name="login_rollup_state_single_row"),)
+
+    id = Column(SmallInteger, primary_key=True, default=1)
+    # Строки login_history с login_date < watermark уже учтены в сводке.
+    watermark = Column(DateTime, nullable=False)
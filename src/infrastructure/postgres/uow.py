@@ -1,18 +1,82 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from functools import cached_property
 
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.domain.entities.change_event import ChangeEvent
+from src.infrastructure.postgres.query_stats import record_commit
+from src.infrastructure.postgres.repositories.idempotency_repo import \
+    IdempotencyRepository
+from src.infrastructure.postgres.repositories.login_analytics_repo import \
+    LoginAnalyticsRepository
+from src.infrastructure.postgres.repositories.outbox_repo import \
+    OutboxRepository
+from src.infrastructure.postgres.repositories.refresh_token_repo import \
+    RefreshTokenRepository
+from src.infrastructure.postgres.repositories.token_epoch_repo import \
+    TokenEpochRepository
 from src.infrastructure.postgres.repositories.user_repo import UserRepository
 
 
 class UnitOfWork:
-    def __init__(self, session: AsyncSession):
-        self.session = session
-        self.user = UserRepository(session)
+    """
+    Сессия и репозитории создаются при первом обращении: запрос, отклонённый
+    до работы с БД (ошибка валидации, 401), не открывает сессию.
+    События об изменениях пользователей копятся до commit и записываются
+    в outbox в той же транзакции, что и сами изменения.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self._session_factory = session_factory
+        self._events: list[ChangeEvent] = []
+
+    @cached_property
+    def session(self) -> AsyncSession:
+        return self._session_factory()
+
+    @cached_property
+    def user(self) -> UserRepository:
+        return UserRepository(self.session)
+
+    @cached_property
+    def refresh_token(self) -> RefreshTokenRepository:
+        return RefreshTokenRepository(self.session)
+
+    @cached_property
+    def token_epoch(self) -> TokenEpochRepository:
+        return TokenEpochRepository(self.session)
+
+    @cached_property
+    def login_analytics(self) -> LoginAnalyticsRepository:
+        return LoginAnalyticsRepository(self.session)
+
+    @cached_property
+    def idempotency(self) -> IdempotencyRepository:
+        return IdempotencyRepository(self.session)
+
+    @cached_property
+    def outbox(self) -> OutboxRepository:
+        return OutboxRepository(self.session)
+
+    @property
+    def _opened_session(self) -> AsyncSession | None:
+        return self.__dict__.get("session")
+
+    def add_event(self, event_type: str, user_id, **data) -> None:
+        self._events.append(ChangeEvent(event_type, user_id, data))
 
     async def commit(self) -> None:
-        await self.session.commit()
+        if self._events:
+            await self.outbox.add_many(self._events)
+            self._events.clear()
+        if self._opened_session is not None:
+            await self.session.commit()
+            record_commit()
 
     async def rollback(self) -> None:
-        await self.session.rollback()
+        self._events.clear()
+        if self._opened_session is not None:
+            await self.session.rollback()
 
     async def close(self) -> None:
-        await self.session.close()
\ No newline at end of file
+        if self._opened_session is not None:
+            await self.session.close()
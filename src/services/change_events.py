@@ -0,0 +1,96 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+import orjson
+
+from src.core.notifier import Notifier
+from src.domain.entities.change_event import ChangeEvent
+
+USER_UPDATED = "user.updated"
+USER_PASSWORD_CHANGED = "user.password_changed"
+USER_DELETED = "user.deleted"
+USER_SESSIONS_REVOKED = "user.sessions_revoked"
+# Массовый отзыв записывается не событием на пользователя, а пачками id:
+# столько id в JSON укладывается в полезную нагрузку одного NOTIFY.
+SESSIONS_REVOKED_IDS_PER_EVENT = 150
+
+
+def add_sessions_revoked_events(
+    uow,
+    user_ids: list,
+    created_before: datetime | None,
+    by_ids: bool,
+) -> None:
+    """
+    События user.sessions_revoked без user_id. Отзыв по списку id пишет
+    затронутых пользователей пачками в data.user_ids; отзыв только по
+    created_before - одно событие с условием, и потребитель перечитывает
+    token_version всех пользователей.
+    """
+    if not user_ids:
+        return
+    if not by_ids:
+        uow.add_event(
+            USER_SESSIONS_REVOKED,
+            None,
+            created_before=created_before.isoformat(),
+            users=len(user_ids),
+        )
+        return
+    for start in range(0, len(user_ids), SESSIONS_REVOKED_IDS_PER_EVENT):
+        chunk = user_ids[start: start + SESSIONS_REVOKED_IDS_PER_EVENT]
+        uow.add_event(
+            USER_SESSIONS_REVOKED, None, user_ids=[str(user_id) for user_id in chunk]
+        )
+
+
+def format_sse(event_type: str, position: int, data: dict) -> bytes:
+    return (
+        f"id: {position}\nevent: {event_type}\ndata: ".encode()
+        + orjson.dumps(data)
+        + b"\n\n"
+    )
+
+
+def format_change_event(event: ChangeEvent) -> bytes:
+    return format_sse(event.event_type, event.position, event.to_message())
+
+
+async def stream_change_events(
+    uow,
+    notifier: Notifier,
+    cursor: int | None,
+    batch_size: int,
+    keepalive: float,
+) -> AsyncIterator[bytes]:
+    """
+    Поток опубликованных событий outbox в формате server-sent events.
+
+    id каждого события - его position, поэтому переподключение с
+    Last-Event-ID продолжает поток без пропусков и повторов. Без курсора
+    поток начинается с текущего конца (событие ready). Если события после
+    курсора уже удалены по сроку хранения, отправляется reset: потребитель
+    сбрасывает кэш целиком и продолжает с переданного id.
+    Между выборками соединение с БД возвращается в пул.
+    """
+    first, last = await uow.outbox.bounds()
+    await uow.rollback()
+    last = last or 0
+    if cursor is None:
+        yield format_sse("ready", last, {"position": last})
+        cursor = last
+    elif cursor > last or (first is not None and cursor < first - 1):
+        yield format_sse("reset", last, {"position": last})
+        cursor = last
+
+    while True:
+        waiter = notifier.waiter()
+        events = await uow.outbox.published_after(cursor, batch_size)
+        await uow.rollback()
+        for event in events:
+            yield format_change_event(event)
+            cursor = event.position
+        if len(events) == batch_size:
+            continue
+        if not await notifier.wait(waiter, keepalive):
+            yield b": keep-alive\n\n"
@@ -0,0 +1,86 @@
+import hashlib
+import hmac
+from datetime import UTC, datetime, timedelta
+
+import orjson
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.domain.entities.idempotency import IdempotencyRecord
+
+# Итоги завершённых запросов по (scope, key); источник истины - таблица
+# idempotency_key.
+idempotency_cache = TTLCache(
+    maxsize=settings.idempotency_cache_size,
+    ttl=settings.idempotency_ttl_sec,
+)
+# Тело запроса содержит пароль: отпечаток - HMAC с секретом сервера,
+# а не быстрый хеш, который можно перебрать по словарю.
+_FINGERPRINT_KEY = hashlib.sha256(
+    (settings.idempotency_secret or settings.private_key).encode("utf-8")
+).digest()
+
+
+def request_fingerprint(data: BaseModel) -> str:
+    body = orjson.dumps(data.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    return hmac.new(_FINGERPRINT_KEY, body, hashlib.sha256).hexdigest()
+
+
+def _remember(record: IdempotencyRecord) -> None:
+    ttl = (record.expires_at - datetime.now(UTC)).total_seconds()
+    if ttl > 0:
+        idempotency_cache.set((record.scope, record.key), record, ttl)
+
+
+class IdempotentRequest:
+    """
+    Обработка заголовка Idempotency-Key для эндпоинта `scope`.
+
+    replay() возвращает сохранённый итог повторного запроса, по которому
+    эндпоинт отвечает без повторных изменений и bcrypt, либо None - тогда
+    эндпоинт выполняется и вместо uow.commit() вызывает commit(outcome):
+    итог сохраняется в той же транзакции, что и изменения. В итоге нет
+    секретов (токенов): повтор выпускает новые. Без ключа оба метода -
+    обычный путь.
+    """
+
+    def __init__(self, uow, scope: str, key: str | None, data: BaseModel):
+        self.uow = uow
+        self.scope = scope
+        self.key = key
+        self.request_hash = request_fingerprint(data) if key is not None else None
+
+    async def replay(self) -> IdempotencyRecord | None:
+        if self.key is None:
+            return None
+        record = idempotency_cache.get((self.scope, self.key))
+        if record is None:
+            await self.uow.idempotency.lock(self.scope, self.key)
+            record = await self.uow.idempotency.get(self.scope, self.key)
+            if record is None:
+                return None
+            _remember(record)
+        if record.request_hash != self.request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request.",
+            )
+        return record
+
+    async def commit(self, outcome: dict, status_code: int = 200) -> None:
+        if self.key is None:
+            await self.uow.commit()
+            return
+        record = IdempotencyRecord.create(
+            scope=self.scope,
+            key=self.key,
+            request_hash=self.request_hash,
+            outcome=outcome,
+            lifetime=timedelta(seconds=settings.idempotency_ttl_sec),
+            status_code=status_code,
+        )
+        await self.uow.idempotency.save(record)
+        await self.uow.commit()
+        _remember(record)
@@ -1,4 +1,7 @@
+import re
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 import bcrypt
 import jwt
@@ -6,6 +9,16 @@ from asyncpg.pgproto.pgproto import timedelta
 from fastapi import HTTPException, Request, status
 
 from src.core.config import settings
+from src.services.token_epoch import token_epoch
+
+if TYPE_CHECKING:
+    from src.domain.entities.user import User
+
+
+@lru_cache(maxsize=8)
+def load_key(key: str, algorithm: str):
+    """Разбирает PEM-ключ один раз и кэширует готовый объект ключа."""
+    return jwt.get_algorithm_by_name(algorithm).prepare_key(key)
 
 
 def encode_jwt(
@@ -23,7 +36,9 @@ def encode_jwt(
     )
     exp = iat + timedelta(minutes=expire_in_minutes)
     to_encode.update(exp=exp, iat=iat)
-    encoded = jwt.encode(to_encode, key=private_key, algorithm=algorithm)
+    encoded = jwt.encode(
+        to_encode, key=load_key(private_key, algorithm), algorithm=algorithm
+    )
     return encoded
 
 
@@ -32,10 +47,42 @@ def decode_jwt(
     key: str = settings.public_key,
     algorithm: str = settings.algorithm,
 ) -> dict:
-    decoded = jwt.decode(token, key, algorithms=[algorithm])
+    decoded = jwt.decode(token, load_key(key, algorithm), algorithms=[algorithm])
     return decoded
 
 
+def build_access_claims(user: "User", profile: str = settings.token_profile) -> dict:
+    """
+    Claims access-токена. Профиль compact оставляет только sub и ver
+    (плюс exp и iat): остальные данные потребитель получает
+    через интроспекцию, а не в каждом заголовке Authorization.
+    """
+    if profile == "compact":
+        return {"sub": str(user.id), "ver": user.token_version}
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "username": user.username,
+        "token_version": user.token_version,
+    }
+
+
+def claims_token_version(claims: dict) -> int | None:
+    return claims.get("ver", claims.get("token_version"))
+
+
+def claims_issued_at(claims: dict) -> float | None:
+    """
+    iat токена. Токен без iat нельзя сравнить с token_epoch - при заданной
+    границе он считается отозванным.
+    """
+    return claims.get("iat")
+
+
+def is_token_revoked(claims: dict) -> bool:
+    return token_epoch.revokes_timestamp(claims_issued_at(claims))
+
+
 def hash_pwd(
     password: str,
 ) -> str:
@@ -44,6 +91,13 @@ def hash_pwd(
     return hashes_pass.decode("utf-8")
 
 
+BCRYPT_HASH_RE = re.compile(r"^\$2[abxy]\$\d{2}\$[./A-Za-z0-9]{53}$")
+
+
+def is_bcrypt_hash(value: str) -> bool:
+    return BCRYPT_HASH_RE.match(value) is not None
+
+
 def validate_pwd(password_raw: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         password_raw.strip().encode("utf-8"),
@@ -51,19 +105,29 @@ def validate_pwd(password_raw: str, hashed_password: str) -> bool:
     )
 
 
-def get_current_user(request: Request):
-    auth_header = request.headers.get("Authorization")
+def parse_bearer(auth_header: str | None) -> str | None:
     if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    return auth_header[7:] or None
+
+
+def get_current_user(request: Request):
+    token = parse_bearer(request.headers.get("Authorization"))
+    if token is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authorization header missing or malformed",
         )
-    token = auth_header[7:]
     try:
         payload = decode_jwt(token)
-        return payload
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         )
+    if is_token_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+        )
+    return payload
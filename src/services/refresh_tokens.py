@@ -0,0 +1,102 @@
+import hashlib
+import secrets
+from datetime import timedelta
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from loguru import logger
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.domain.entities.refresh_token import RefreshToken
+from src.services.token_epoch import token_epoch
+
+# Кэш записей по хешу токена. Источник истины - БД: по кэшу без запроса
+# отклоняются только заведомо негодные токены (погашенные, просроченные,
+# неизвестные), активный токен всегда гасится атомарным UPDATE в БД.
+refresh_token_cache = TTLCache(
+    maxsize=settings.refresh_token_cache_size,
+    ttl=settings.cache_expire_sec,
+)
+_UNKNOWN = object()
+
+
+def hash_refresh_token(raw_token: str) -> str:
+    # Токен - 256 случайных бит, медленный хеш не нужен: sha256 достаточно.
+    return hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token.",
+    )
+
+
+async def issue_refresh_token(
+    uow,
+    user_id: UUID,
+    family_id: UUID | None = None,
+) -> str:
+    """Создаёт refresh-токен; в БД сохраняется только его хеш."""
+    raw_token = secrets.token_urlsafe(32)
+    token = RefreshToken.create(
+        user_id=user_id,
+        token_hash=hash_refresh_token(raw_token),
+        lifetime=timedelta(days=settings.refresh_token_expire_days),
+        family_id=family_id,
+    )
+    await uow.refresh_token.create(token)
+    refresh_token_cache.set(token.token_hash, token)
+    return raw_token
+
+
+async def _revoke_family(uow, token: RefreshToken) -> None:
+    key = ("revoked_family", token.family_id)
+    if refresh_token_cache.get(key):
+        return
+    logger.warning(
+        f"Refresh token reuse detected for user {token.user_id}, "
+        f"revoking family {token.family_id}."
+    )
+    await uow.refresh_token.revoke_family(token.family_id)
+    await uow.commit()
+    refresh_token_cache.set(key, True)
+
+
+async def rotate_refresh_token(uow, raw_token: str) -> tuple[RefreshToken, str]:
+    """
+    Гасит предъявленный refresh-токен и выпускает следующий в том же семействе.
+    Повторное предъявление уже использованного токена отзывает всё семейство,
+    токены старше глобальной границы token_epoch не принимаются.
+    Возвращает (погашенный токен, новый сырой токен); коммит - за вызывающим.
+    """
+    token_hash = hash_refresh_token(raw_token)
+    cached = refresh_token_cache.get(token_hash)
+    if cached is _UNKNOWN:
+        raise _invalid_refresh_token()
+    if cached is not None and not cached.is_active:
+        if cached.revoked_at is not None:
+            await _revoke_family(uow, cached)
+        raise _invalid_refresh_token()
+    if cached is not None and token_epoch.revokes(cached.created_at):
+        raise _invalid_refresh_token()
+
+    current = await uow.refresh_token.consume(token_hash)
+    if current is None:
+        known = next(
+            iter(await uow.refresh_token.filter(token_hash=token_hash)), None
+        )
+        if known is None:
+            refresh_token_cache.set(token_hash, _UNKNOWN)
+            raise _invalid_refresh_token()
+        refresh_token_cache.set(token_hash, known)
+        if known.revoked_at is not None:
+            await _revoke_family(uow, known)
+        raise _invalid_refresh_token()
+
+    refresh_token_cache.set(token_hash, current)
+    if token_epoch.revokes(current.created_at):
+        raise _invalid_refresh_token()
+    new_token = await issue_refresh_token(uow, current.user_id, current.family_id)
+    return current, new_token
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+
+class TokenEpoch:
+    """
+    Кэш глобальной границы "not before" в процессе. Токены, выпущенные
+    раньше неё, недействительны. Значение хранится в БД (token_epoch),
+    воркеры перечитывают его фоновой задачей.
+    """
+
+    def __init__(self):
+        self.not_before: datetime | None = None
+
+    def revokes(self, issued_at: datetime | None) -> bool:
+        if self.not_before is None:
+            return False
+        return issued_at is None or issued_at < self.not_before
+
+    def revokes_timestamp(self, issued_at: float | None) -> bool:
+        # iat хранится с точностью до секунды: токен, выпущенный в ту же
+        # секунду сразу после границы, тоже отклоняется.
+        if self.not_before is None:
+            return False
+        return issued_at is None or issued_at < self.not_before.timestamp()
+
+
+token_epoch = TokenEpoch()
+
+
+async def load_token_epoch(uow) -> None:
+    token_epoch.not_before = await uow.token_epoch.get()
@@ -0,0 +1,59 @@
+import asyncio
+import os
+
+import pytest
+
+# Настройки читаются при импорте src.core.config - до импорта приложения.
+os.environ["QUERY_BUDGET_ENFORCE"] = "true"
+os.environ["LOGIN_HISTORY_ENABLED"] = "true"
+os.environ.setdefault("ADMIN_API_KEY", "test-admin-key")
+
+import asyncpg  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.app.main import app_factory  # noqa: E402
+from src.core.config import settings  # noqa: E402
+
+
+def _postgres_available() -> bool:
+    async def probe() -> None:
+        connection = await asyncpg.connect(
+            host=settings.pg_host,
+            port=settings.pg_port,
+            user=settings.pg_user,
+            password=settings.pg_password,
+            database=settings.pg_name,
+            timeout=3,
+        )
+        await connection.close()
+
+    try:
+        asyncio.run(probe())
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError):
+        return False
+    return True
+
+
+@pytest.fixture(scope="session", params=["memory", "postgres"])
+def app(request):
+    """
+    Приложение на каждом бэкенде хранения. In-memory репозитории считают
+    каждый вызов одним SQL-выражением, поэтому бюджеты проверяются и без БД;
+    Postgres пропускается, если база недоступна.
+    """
+    if request.param == "postgres" and not _postgres_available():
+        pytest.skip("Postgres is not available.")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("STORAGE_BACKEND", request.param)
+        return app_factory()
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin_headers() -> dict:
+    return {"X-Admin-Key": settings.admin_api_key}
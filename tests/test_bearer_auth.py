@@ -0,0 +1,25 @@
+from fastapi import Depends, FastAPI
+
+from src.app.middleware.bearer_auth import BearerAuthMiddleware, bearer_claims
+
+
+def http_scope(app: FastAPI, path: str) -> dict:
+    return {"type": "http", "app": app, "path": path, "method": "GET"}
+
+
+def test_routes_added_after_first_request_are_protected():
+    app = FastAPI()
+
+    @app.get("/early", dependencies=[Depends(bearer_claims)])
+    async def early():
+        return {}
+
+    middleware = BearerAuthMiddleware(app)
+    assert middleware._is_protected(http_scope(app, "/early"))
+    assert not middleware._is_protected(http_scope(app, "/late/1"))
+
+    @app.get("/late/{item_id}", dependencies=[Depends(bearer_claims)])
+    async def late(item_id: int):
+        return {}
+
+    assert middleware._is_protected(http_scope(app, "/late/1"))
@@ -0,0 +1,17 @@
+import uuid
+
+from src.core.config import settings
+from src.domain.entities.user import User
+from src.services.jwt_utils import (build_access_claims, claims_issued_at,
+                                    decode_jwt, encode_jwt)
+
+
+def test_compact_token_keeps_issued_at(monkeypatch):
+    user = User(id=uuid.uuid4(), username="user", email="user@example.com")
+    claims = decode_jwt(encode_jwt(build_access_claims(user, "compact")))
+    assert set(claims) == {"sub", "ver", "exp", "iat"}
+
+    # iat не зависит от текущего срока жизни токенов.
+    issued_at = claims_issued_at(claims)
+    monkeypatch.setattr(settings, "access_token_expire_minutes", 1)
+    assert claims_issued_at(claims) == issued_at == claims["iat"]
@@ -0,0 +1,29 @@
+import asyncio
+import uuid
+
+import pytest
+
+from src.infrastructure.memory.storage import InMemoryStorage
+from src.infrastructure.memory.uow import InMemoryUnitOfWork
+from src.infrastructure.postgres.uow import UnitOfWork
+
+
+def test_is_unit_of_work():
+    assert isinstance(InMemoryUnitOfWork(InMemoryStorage()), UnitOfWork)
+
+
+def test_events_written_on_commit_only():
+    storage = InMemoryStorage()
+    uow = InMemoryUnitOfWork(storage)
+
+    uow.add_event("user.updated", uuid.uuid4())
+    asyncio.run(uow.rollback())
+    uow.add_event("user.deleted", uuid.uuid4())
+    asyncio.run(uow.commit())
+
+    assert [event.event_type for event in storage.outbox_events] == ["user.deleted"]
+
+
+def test_has_no_session():
+    with pytest.raises(NotImplementedError):
+        InMemoryUnitOfWork(InMemoryStorage()).session
@@ -0,0 +1,53 @@
+"""
+Уникальность username и email в InMemoryUserRepository, как в таблице "user".
+"""
+import asyncio
+import uuid
+from dataclasses import replace
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.domain.entities.user import User
+from src.infrastructure.memory.repositories.user_repo import \
+    InMemoryUserRepository
+from src.infrastructure.memory.storage import InMemoryStorage
+
+
+def make_user(name: str) -> User:
+    return User(id=uuid.uuid4(), username=name, email=f"{name}@example.com")
+
+
+@pytest.fixture
+def repo() -> InMemoryUserRepository:
+    return InMemoryUserRepository(InMemoryStorage())
+
+
+@pytest.mark.parametrize("field", ["username", "email"])
+def test_update_rejects_taken_value(repo, field):
+    first, second = make_user("first"), make_user("second")
+    asyncio.run(repo.create(first))
+    asyncio.run(repo.create(second))
+
+    taken = replace(second, **{field: getattr(first, field)})
+    with pytest.raises(IntegrityError):
+        asyncio.run(repo.update(taken))
+
+    # Индексы и записи не изменились.
+    assert repo.storage.user_ids_by_username == {
+        "first": first.id,
+        "second": second.id,
+    }
+    assert asyncio.run(repo.get(id=second.id)) == second
+
+
+def test_update_keeps_own_values(repo):
+    user = make_user("user")
+    asyncio.run(repo.create(user))
+
+    updated = asyncio.run(repo.update(replace(user, first_name="Name")))
+    renamed = asyncio.run(repo.update(replace(updated, username="renamed")))
+
+    assert renamed.first_name == "Name"
+    assert repo.storage.user_ids_by_username == {"renamed": user.id}
+    assert repo.storage.user_ids_by_email == {"user@example.com": user.id}
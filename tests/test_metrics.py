@@ -0,0 +1,7 @@
+def test_metrics_require_admin_key(client, admin_headers):
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Admin-Key": "wrong"}).status_code == 403
+
+    response = client.get("/metrics", headers=admin_headers)
+    assert response.status_code == 200
+    assert "# TYPE db_statements_total counter" in response.text
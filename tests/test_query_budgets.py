@@ -0,0 +1,162 @@
+"""
+Бюджеты SQL-выражений маршрутов (query_budget) на обоих бэкендах хранения.
+QUERY_BUDGET_ENFORCE=true (см. conftest): превышение бюджета поднимает
+QueryBudgetExceeded, и TestClient пробрасывает его в тест.
+"""
+import uuid
+from datetime import UTC, date, datetime
+
+import pytest
+from dishka import FromDishka
+from dishka.integrations.fastapi import inject
+
+from src.app.middleware.query_stats import QueryBudgetExceeded, query_budget
+from src.core.config import settings
+from src.infrastructure.postgres.uow import UnitOfWork
+
+USER = "/api/v1/user"
+ADMIN = "/api/v1/admin"
+
+
+def new_user_data() -> dict:
+    name = f"budget_{uuid.uuid4().hex[:12]}"
+    return {"username": name, "email": f"{name}@example.com", "password": "secret"}
+
+
+@pytest.fixture
+def user(client) -> dict:
+    data = new_user_data()
+    response = client.post(f"{USER}/registration", json=data)
+    assert response.status_code == 200, response.text
+    return {**data, **response.json()}
+
+
+def test_budget_is_enforced(app, client):
+    @app.get("/_budget_probe", dependencies=[query_budget(0)])
+    @inject
+    async def budget_probe(uow: FromDishka[UnitOfWork]):
+        await uow.user.filter(username="")
+        return {}
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/_budget_probe")
+
+
+def test_registration(client):
+    assert client.post(f"{USER}/registration", json=new_user_data()).status_code == 200
+
+
+def test_registration_taken(client, user):
+    response = client.post(
+        f"{USER}/registration",
+        json={**new_user_data(), "username": user["username"]},
+    )
+    assert response.status_code == 400
+
+
+def test_registration_idempotent(client):
+    data, headers = new_user_data(), {"Idempotency-Key": uuid.uuid4().hex}
+    first = client.post(f"{USER}/registration", json=data, headers=headers)
+    replay = client.post(f"{USER}/registration", json=data, headers=headers)
+    assert first.status_code == replay.status_code == 200
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    # Повтор ничего не пишет в БД: refresh-токен есть только в первом ответе.
+    assert first.json()["refresh_token"] and replay.json()["refresh_token"] is None
+
+
+def test_login(client, user):
+    response = client.post(
+        f"{USER}/login",
+        json={"username": user["username"], "password": user["password"]},
+    )
+    assert response.status_code == 200
+
+
+def test_refresh_and_reuse(client, user):
+    token = {"refresh_token": user["refresh_token"]}
+    assert client.post(f"{USER}/refresh", json=token).status_code == 200
+    # Повторное предъявление отзывает семейство токенов.
+    assert client.post(f"{USER}/refresh", json=token).status_code == 401
+
+
+def test_change_password(client, user):
+    data = {
+        "username": user["username"],
+        "password": user["password"],
+        "new_password": "secret2",
+    }
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    assert client.patch(f"{USER}/change_password", json=data).status_code == 200
+    data = {**data, "password": "secret2", "new_password": "secret3"}
+    first = client.patch(f"{USER}/change_password", json=data, headers=headers)
+    replay = client.patch(f"{USER}/change_password", json=data, headers=headers)
+    assert first.status_code == replay.status_code == 200
+
+
+def test_update_user(client, user):
+    data = {
+        "username": user["username"],
+        "password": user["password"],
+        "updates": {"first_name": "Budget", "password": "secret2"},
+    }
+    assert client.patch(f"{USER}/update_user", json=data).status_code == 200
+
+
+def test_delete(client, user):
+    data = {"username": user["username"], "password": user["password"]}
+    assert client.request("DELETE", f"{USER}/delete", json=data).status_code == 200
+
+
+def test_lookup(client, admin_headers, user):
+    me = client.post(
+        f"{ADMIN}/tokens/introspect",
+        json={"token": user["access_token"]},
+        headers=admin_headers,
+    )
+    ids = [me.json()["sub"]] + [
+        str(uuid.uuid4()) for _ in range(settings.batch_lookup_max_ids - 1)
+    ]
+    response = client.post(
+        f"{ADMIN}/users/lookup", json={"ids": ids}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["results"][0]["found"]
+
+
+def test_revoke_sessions(client, admin_headers, user):
+    response = client.post(
+        f"{ADMIN}/sessions/revoke",
+        json={"created_before": datetime.now(UTC).isoformat()},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["users"] >= 1
+
+
+def test_token_epoch(client, admin_headers):
+    response = client.post(
+        f"{ADMIN}/sessions/not-before",
+        json={"not_before": "2000-01-01T00:00:00Z"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+
+
+def test_login_analytics(client, admin_headers):
+    today = date.today().isoformat()
+    response = client.get(
+        f"{ADMIN}/analytics/logins",
+        params={"date_from": today, "date_to": today},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+
+
+def test_introspect(client, admin_headers, user):
+    response = client.post(
+        f"{ADMIN}/tokens/introspect",
+        json={"token": user["access_token"]},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["active"]